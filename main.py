@@ -21,6 +21,8 @@ The example showcases the main design patterns of the system:
 """
 
 import asyncio
+import os
+import time
 import uuid
 
 from langchain_core.documents import Document
@@ -28,6 +30,40 @@ from langchain_core.messages import HumanMessage
 
 from src.graphs import index_graph, main_graph, researcher_graph
 from src.log_util import logger
+from src.shared.configuration_manager import AgentConfiguration
+from src.shared.model_manager import model_manager
+from src.shared.text_encoder import aclose_text_encoders
+from src.shared.utils import LoopLocal
+
+# 限制同时运行的 LLM 驱动图调用数量，避免对模型提供方的并发请求过多
+llm_semaphore = LoopLocal(
+    lambda: asyncio.Semaphore(int(os.environ.get("LLM_CONCURRENCY", "4")))
+)
+
+# 直接回答用户的终端节点，其 token 会被流式输出
+ANSWER_NODES = {"respond", "ask_for_more_info", "respond_to_general_query"}
+
+
+async def stream_answer(question: str, config: dict) -> str:
+    """Stream the main graph's answer to a question and return the full text."""
+    start = time.perf_counter()
+    first_token_at = None
+    parts = []
+    async for chunk, metadata in main_graph.astream(
+        {"messages": [HumanMessage(content=question)]}, config, stream_mode="messages"
+    ):
+        if metadata.get("langgraph_node") not in ANSWER_NODES or not chunk.content:
+            continue
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+            logger.debug(f"First token after {first_token_at - start:.2f}s")
+        parts.append(chunk.content)
+
+    if not parts:
+        # Fall back to the checkpointed answer when no tokens were streamed
+        state = await main_graph.aget_state(config)
+        return state.values["messages"][-1].content
+    return "".join(parts)
 
 
 async def example_indexing():
@@ -100,7 +136,8 @@ async def example_researcher():
 
     try:
         # Run the researcher graph
-        result = await researcher_graph.ainvoke({"question": question}, config)
+        async with llm_semaphore.get():
+            result = await researcher_graph.ainvoke({"question": question}, config)
 
         # Display results
         logger.info(f"Generated queries: {result['queries']}")
@@ -135,23 +172,20 @@ async def example_retrieval():
         question1 = "RAG Research Agent 有哪些应用场景？"
         logger.info(f"Question 1: {question1}")
 
-        result1 = await main_graph.ainvoke(
-            {"messages": [HumanMessage(content=question1)]}, config
-        )
+        async with llm_semaphore.get():
+            answer1 = await stream_answer(question1, config)
 
-        answer1 = result1["messages"][-1].content
         logger.info(f"Answer 1: {answer1}")
         logger.info("===================================")
 
-        # Follow-up question
+        # Follow-up question: shares the thread (conversation state) with the
+        # first question, so it must run after it rather than concurrently
         question2 = "RAG Research Agent 和传统的 RAG 有什么区别？"
         logger.info(f"Question 2: {question2}")
 
-        result2 = await main_graph.ainvoke(
-            {"messages": [HumanMessage(content=question2)]}, config
-        )
+        async with llm_semaphore.get():
+            answer2 = await stream_answer(question2, config)
 
-        answer2 = result2["messages"][-1].content
         logger.info(f"Answer 2: {answer2}")
         logger.info("Answer 2 generated successfully")
         logger.info("===================================")
@@ -166,20 +200,25 @@ async def main():
     logger.info("==========================================")
 
     try:
-        # # Run indexing
-        # await example_indexing()
+        # Load the default chat model while documents are being indexed
+        prewarm = asyncio.create_task(
+            model_manager.prewarm([AgentConfiguration().llm_model])
+        )
 
-        # # Run researcher
-        # await example_researcher()
+        # Run indexing first: the researcher and retrieval examples read from the index
+        await example_indexing()
+        await prewarm
 
-        # Run retrieval
-        await example_retrieval()
+        # Researcher and retrieval examples are independent, run them concurrently
+        await asyncio.gather(example_researcher(), example_retrieval())
 
         logger.info("All examples completed successfully!")
 
     except Exception as e:
         logger.error(f"Error running examples: {e}")
         raise
+    finally:
+        await aclose_text_encoders()
 
 
 if __name__ == "__main__":
@@ -10,16 +10,91 @@ Elasticsearch CRUD Manager
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
+import threading
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, List
+from typing import Any, Dict, Iterator, List
 
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 from langchain_core.documents import Document
 from langchain_elasticsearch import ElasticsearchStore
 
+from src.crud.semantic_cache import SemanticCache
+from src.log_util import logger
 from src.shared.configuration_manager import BaseConfiguration
-from src.shared.text_encoder import make_text_encoder
+from src.shared.index_cache import clear_index_cache
+from src.shared.text_encoder import (
+    aembed_documents_batched,
+    embed_documents_batched,
+    get_text_encoder,
+)
+
+# Number of documents embedded and sent per bulk request
+BULK_SIZE = int(os.environ.get("ES_BULK_SIZE", "500"))
+
+
+class _BulkLoadState:
+    """Concurrent bulk loads of one index and the refresh setting they replaced."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.count = 0
+        self.disabled = False
+        self.refresh_interval: str | None = None
+
+
+# Per-index bulk load state; the module lock only guards this dict
+_bulk_loads: Dict[str, _BulkLoadState] = {}
+_bulk_loads_lock = threading.Lock()
+
+
+def _get_refresh_interval(es_client: Elasticsearch, index_name: str) -> str | None:
+    """Read the ``refresh_interval`` set on an index, or None if it uses the default."""
+    response = es_client.indices.get_settings(
+        index=index_name, name="index.refresh_interval", flat_settings=True
+    )
+    for name in response:
+        return response[name].get("settings", {}).get("index.refresh_interval")
+    return None
+
+
+@contextmanager
+def _refresh_disabled(es_client: Elasticsearch, index_name: str) -> Iterator[None]:
+    """Disable periodic refresh of an index while bulk loads overlap.
+
+    The first load saves the index's ``refresh_interval`` and sets it to -1; the
+    last one restores the saved value and refreshes, so loads running on several
+    threads never restore each other's "-1". Settings calls hold only the lock
+    of the index being loaded.
+    """
+    with _bulk_loads_lock:
+        state = _bulk_loads.setdefault(index_name, _BulkLoadState())
+    with state.lock:
+        if not state.count and es_client.indices.exists(index=index_name):
+            state.refresh_interval = _get_refresh_interval(es_client, index_name)
+            es_client.indices.put_settings(
+                index=index_name, settings={"index": {"refresh_interval": "-1"}}
+            )
+            state.disabled = True
+        state.count += 1
+    try:
+        yield
+    finally:
+        with state.lock:
+            state.count -= 1
+            if not state.count:
+                disabled, state.disabled = state.disabled, False
+                if es_client.indices.exists(index=index_name):
+                    if disabled:
+                        es_client.indices.put_settings(
+                            index=index_name,
+                            settings={
+                                "index": {"refresh_interval": state.refresh_interval}
+                            },
+                        )
+                    es_client.indices.refresh(index=index_name)
 
 
 class ElasticsearchCRUDManager:
@@ -28,11 +103,15 @@ class ElasticsearchCRUDManager:
     def __init__(self, configuration: BaseConfiguration):
         """Initialize the CRUD manager with a configuration."""
         self.configuration = configuration
-        self.embedding_model = make_text_encoder(configuration.embedding_model)
+        self.embedding_model = get_text_encoder(configuration.embedding_model)
         self._vector_store = None
+        self._search_cache = SemanticCache()
+        self._es_client: Elasticsearch | None = None
+        self._async_es_client: AsyncElasticsearch | None = None
 
-    def _get_connection_options(self) -> tuple[Dict[str, Any], str]:
-        """Get connection options and URL for Elasticsearch."""
+    @functools.cached_property
+    def _connection_options(self) -> tuple[Dict[str, Any], str]:
+        """Connection options and URL for Elasticsearch, resolved once per instance."""
         connection_options = {}
         es_url = os.environ.get("ELASTICSEARCH_URL", "http://localhost:9200")
 
@@ -55,21 +134,17 @@ class ElasticsearchCRUDManager:
     def _get_vector_store(self) -> ElasticsearchStore:
         """Get Elasticsearch vector store."""
         if self._vector_store is None:
-            connection_options, es_url = self._get_connection_options()
-
             self._vector_store = ElasticsearchStore(
-                **connection_options,
-                es_url=es_url,
+                es_connection=self._get_es_client(),
                 index_name=os.environ.get("ELASTICSEARCH_INDEX", "index"),
                 embedding=self.embedding_model,
             )
 
         return self._vector_store
 
-    @contextmanager
-    def _get_es_client(self) -> Generator[Elasticsearch, None, None]:
-        """Context manager for Elasticsearch client."""
-        connection_options, es_url = self._get_connection_options()
+    def _get_es_client_args(self) -> tuple[Dict[str, Any], str]:
+        """Get Elasticsearch client arguments and URL."""
+        connection_options, es_url = self._connection_options
 
         es_client_args = {}
         if self.configuration.retriever_provider == "elastic-local":
@@ -82,11 +157,79 @@ class ElasticsearchCRUDManager:
         else:
             es_client_args = {"api_key": connection_options["es_api_key"]}
 
-        es_client = Elasticsearch(hosts=[es_url], **es_client_args)
-        try:
-            yield es_client
-        finally:
-            es_client.close()
+        # Transport tuning for bulk and delete_by_query heavy workloads
+        es_client_args.update(
+            http_compress=True,
+            request_timeout=60,
+            retry_on_timeout=True,
+            max_retries=3,
+            connections_per_node=int(os.environ.get("ES_MAXSIZE", "50")),
+        )
+
+        return es_client_args, es_url
+
+    def _get_es_client(self) -> Elasticsearch:
+        """Get the pooled Elasticsearch client, creating it on first use.
+
+        The client is thread-safe and keeps a connection pool, so a single
+        instance is shared by the vector store and every operation on this manager.
+        """
+        if self._es_client is None:
+            es_client_args, es_url = self._get_es_client_args()
+            self._es_client = Elasticsearch(hosts=[es_url], **es_client_args)
+        return self._es_client
+
+    def _get_async_es_client(self) -> AsyncElasticsearch:
+        """Get the pooled async Elasticsearch client, creating it on first use.
+
+        The underlying HTTP session is bound to the event loop it is first used
+        on; call aclose() before switching event loops.
+        """
+        if self._async_es_client is None:
+            es_client_args, es_url = self._get_es_client_args()
+            self._async_es_client = AsyncElasticsearch(hosts=[es_url], **es_client_args)
+        return self._async_es_client
+
+    async def aclose(self) -> None:
+        """Close the pooled Elasticsearch clients."""
+        if self._es_client is not None:
+            self._es_client.close()
+            self._es_client = None
+            self._vector_store = None
+        if self._async_es_client is not None:
+            await self._async_es_client.close()
+            self._async_es_client = None
+
+    async def _aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts without blocking the event loop."""
+        return await aembed_documents_batched(self.embedding_model, texts)
+
+    def _add_embedded(
+        self, documents: List[Document], vectors: List[List[float]]
+    ) -> List[str]:
+        """Bulk-write documents with precomputed embeddings."""
+        vector_store = self._get_vector_store()
+        index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+        ids: List[str] = []
+
+        with _refresh_disabled(self._get_es_client(), index_name):
+            for start in range(0, len(documents), BULK_SIZE):
+                batch = documents[start : start + BULK_SIZE]
+                ids.extend(
+                    vector_store.add_embeddings(
+                        text_embeddings=[
+                            (doc.page_content, vector)
+                            for doc, vector in zip(
+                                batch, vectors[start : start + BULK_SIZE]
+                            )
+                        ],
+                        metadatas=[doc.metadata for doc in batch],
+                        refresh_indices=False,
+                        bulk_kwargs={"chunk_size": BULK_SIZE},
+                    )
+                )
+
+        return ids
 
     def add_documents(self, documents: List[Document]) -> List[str]:
         """Add documents to the vector store.
@@ -97,8 +240,24 @@ class ElasticsearchCRUDManager:
         Returns:
             List of document IDs
         """
-        vector_store = self._get_vector_store()
-        return vector_store.add_documents(documents)
+        self._search_cache.clear()
+        texts = [doc.page_content for doc in documents]
+        vectors = embed_documents_batched(self.embedding_model, texts)
+        return self._add_embedded(documents, vectors)
+
+    async def aadd_documents(self, documents: List[Document]) -> List[str]:
+        """Asynchronously add documents to the vector store.
+
+        Args:
+            documents: List of Document objects to add
+
+        Returns:
+            List of document IDs
+        """
+        self._search_cache.clear()
+        texts = [doc.page_content for doc in documents]
+        vectors = await self._aembed_documents(texts)
+        return await asyncio.to_thread(self._add_embedded, documents, vectors)
 
     def delete_documents(self, ids: List[str]) -> bool:
         """Delete documents by IDs.
@@ -109,6 +268,7 @@ class ElasticsearchCRUDManager:
         Returns:
             True if successful
         """
+        self._search_cache.clear()
         vector_store = self._get_vector_store()
         vector_store.delete(ids)
         return True
@@ -124,7 +284,81 @@ class ElasticsearchCRUDManager:
             List of similar documents
         """
         vector_store = self._get_vector_store()
-        return vector_store.similarity_search(query, k=k)
+        embedding = self.embedding_model.embed_query(query)
+        cached = self._search_cache.lookup(embedding, k)
+        if cached is not None:
+            return cached
+
+        results = [
+            doc
+            for doc, _ in vector_store.similarity_search_by_vector_with_relevance_scores(
+                embedding, k=k
+            )
+        ]
+        self._search_cache.insert(embedding, k, results)
+        return results
+
+    def search_documents_batch(
+        self, queries: List[str], k: int = 4
+    ) -> List[List[Document]]:
+        """Search for documents similar to each of several queries.
+
+        All queries are embedded in one call and the cache misses are
+        searched in a single request.
+
+        Args:
+            queries: Query texts
+            k: Number of documents to return per query
+
+        Returns:
+            List of similar documents for each query, in query order
+        """
+        if not queries:
+            return []
+
+        embeddings = self.embedding_model.embed_documents(queries)
+        results = [self._search_cache.lookup(embedding, k) for embedding in embeddings]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if misses:
+            searched = self._search_by_vectors([embeddings[i] for i in misses], k)
+            for i, documents in zip(misses, searched):
+                self._search_cache.insert(embeddings[i], k, documents)
+                results[i] = documents
+
+        return [documents or [] for documents in results]
+
+    def _search_by_vectors(
+        self, vectors: List[List[float]], k: int
+    ) -> List[List[Document]]:
+        """Run one kNN search per vector in a single msearch request."""
+        index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+        searches: List[Dict[str, Any]] = []
+        for vector in vectors:
+            searches.append({"index": index_name})
+            searches.append(
+                {
+                    "knn": {
+                        "field": "vector",
+                        "query_vector": vector,
+                        "k": k,
+                        "num_candidates": max(50, k * 10),
+                    },
+                    "size": k,
+                    "_source": ["text", "metadata"],
+                }
+            )
+
+        response = self._get_es_client().msearch(searches=searches)
+        return [
+            [
+                Document(
+                    page_content=hit["_source"].get("text", ""),
+                    metadata=hit["_source"].get("metadata", {}),
+                )
+                for hit in item.get("hits", {}).get("hits", [])
+            ]
+            for item in response["responses"]
+        ]
 
     def count_documents(self) -> int:
         """Count the number of documents in the vector store.
@@ -134,19 +368,35 @@ class ElasticsearchCRUDManager:
         """
         index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
 
-        with self._get_es_client() as es_client:
-            try:
-                count_result = es_client.count(index=index_name)
-                return count_result["count"]
-            except Exception:
-                # If count fails, return 0
-                return 0
+        es_client = self._get_es_client()
+        try:
+            count_result = es_client.count(index=index_name)
+            return count_result["count"]
+        except Exception:
+            # If count fails, return 0
+            return 0
+
+    async def acount_documents(self) -> int:
+        """Asynchronously count the number of documents in the vector store.
+
+        Returns:
+            Number of documents
+        """
+        index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+
+        es_client = self._get_async_es_client()
+        try:
+            count_result = await es_client.count(index=index_name)
+            return count_result["count"]
+        except Exception:
+            # If count fails, return 0
+            return 0
 
     def create_index(self) -> None:
         """Create index/collection in the vector store."""
         # Elasticsearch auto-creates indices when adding documents
         # This method exists for consistency
-        print(
+        logger.debug(
             f"Index creation not required for {self.configuration.retriever_provider}"
         )
 
@@ -155,13 +405,74 @@ class ElasticsearchCRUDManager:
         # For Elasticsearch, delete all documents to effectively clear the index
         vector_store = self._get_vector_store()
         vector_store.delete(ids=None)  # Delete all documents
+        self._clear_caches()
 
     def clear_documents(self) -> None:
-        """Remove all documents from the vector store."""
+        """Remove all documents from the vector store.
+
+        The delete runs sliced across shards and returns once it has
+        completed and the index has been refreshed.
+        """
         index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+        self._get_es_client().delete_by_query(
+            index=index_name,
+            body={"query": {"match_all": {}}},
+            slices="auto",
+            conflicts="proceed",
+            refresh=True,
+        )
+        self._clear_caches()
 
-        with self._get_es_client() as es_client:
-            # Use Elasticsearch client to delete all documents in the index
-            es_client.delete_by_query(
-                index=index_name, body={"query": {"match_all": {}}}, refresh=True
-            )
+    async def aclear_documents(self) -> None:
+        """Asynchronously remove all documents from the vector store."""
+        index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+        await self._get_async_es_client().delete_by_query(
+            index=index_name,
+            body={"query": {"match_all": {}}},
+            slices="auto",
+            conflicts="proceed",
+            refresh=True,
+        )
+        self._clear_caches()
+
+    def start_clear_documents(self) -> str:
+        """Start removing all documents as a background task on the cluster.
+
+        Documents stay searchable until the task completes. Pass the returned
+        task ID to finish_clear_documents before relying on the store being
+        empty.
+
+        Returns:
+            ID of the delete_by_query task
+        """
+        index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+        response = self._get_es_client().delete_by_query(
+            index=index_name,
+            body={"query": {"match_all": {}}},
+            slices="auto",
+            conflicts="proceed",
+            wait_for_completion=False,
+            refresh=False,
+        )
+        return response["task"]
+
+    def finish_clear_documents(self, task_id: str) -> None:
+        """Wait for a background clear to complete and refresh the index.
+
+        Args:
+            task_id: ID returned by start_clear_documents
+        """
+        index_name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+        es_client = self._get_es_client()
+        es_client.tasks.get(task_id=task_id, wait_for_completion=True)
+        es_client.indices.refresh(index=index_name)
+        self._clear_caches()
+
+    def _clear_caches(self) -> None:
+        """Drop cached search results and index state after a clear.
+
+        Called only once the delete has completed, so searches running
+        during the delete cannot repopulate the cache with deleted hits.
+        """
+        self._search_cache.clear()
+        clear_index_cache()
@@ -10,15 +10,26 @@ Milvus CRUD Manager
 
 from __future__ import annotations
 
+import asyncio
 import os
+import uuid
 from typing import List
 
 from langchain_core.documents import Document
 from langchain_milvus import Milvus
 from pymilvus import Collection, connections, utility
 
+from src.crud.semantic_cache import SemanticCache
+from src.log_util import logger
 from src.shared.configuration_manager import BaseConfiguration
-from src.shared.text_encoder import make_text_encoder
+from src.shared.index_cache import clear_index_cache
+from src.shared.text_encoder import (
+    aembed_documents_batched,
+    embed_documents_batched,
+    get_text_encoder,
+)
+
+INSERT_BATCH_SIZE = int(os.environ.get("MILVUS_INSERT_BATCH_SIZE", "1000"))
 
 
 class MilvusCRUDManager:
@@ -27,8 +38,9 @@ class MilvusCRUDManager:
     def __init__(self, configuration: BaseConfiguration):
         """Initialize the CRUD manager with a configuration."""
         self.configuration = configuration
-        self.embedding_model = make_text_encoder(configuration.embedding_model)
+        self.embedding_model = get_text_encoder(configuration.embedding_model)
         self._vector_store = None
+        self._search_cache = SemanticCache()
 
     def _get_milvus_uri(self) -> str:
         """Get Milvus URI from environment variables."""
@@ -46,6 +58,12 @@ class MilvusCRUDManager:
                 uri=self._get_milvus_uri(),
             )
 
+    async def aclose(self, alias: str = "default") -> None:
+        """Close the Milvus connection."""
+        if connections.has_connection(alias):
+            connections.disconnect(alias)
+        self._vector_store = None
+
     def _get_vector_store(self) -> Milvus:
         """Get Milvus vector store."""
         if self._vector_store is None:
@@ -63,13 +81,14 @@ class MilvusCRUDManager:
         """Create index/collection in the vector store."""
         # Milvus auto-creates collections when adding documents
         # This method exists for consistency
-        print(
+        logger.debug(
             f"Index creation not required for {self.configuration.retriever_provider}"
         )
 
-    def delete_index(self) -> None:
-        """Delete the entire index/collection."""
-        # For Milvus, drop the collection
+    def _drop(self) -> None:
+        """Drop the collection and reset the cached vector store."""
+        self._search_cache.clear()
+        clear_index_cache()
         alias = "default"
         self._ensure_connection(alias)
 
@@ -77,6 +96,76 @@ class MilvusCRUDManager:
         if utility.has_collection(collection_name):
             utility.drop_collection(collection_name)
 
+        # The next _get_vector_store() call re-creates the collection on insert
+        self._vector_store = None
+
+    def delete_index(self) -> None:
+        """Delete the entire index/collection."""
+        # For Milvus, drop the collection
+        self._drop()
+
+    async def _aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts without blocking the event loop."""
+        return await aembed_documents_batched(self.embedding_model, texts)
+
+    def _add_embedded(
+        self, documents: List[Document], vectors: List[List[float]]
+    ) -> List[str]:
+        """Insert documents with precomputed embeddings.
+
+        Rows are written to the collection in column-major batches and the
+        collection is flushed once at the end instead of after every batch.
+        """
+        if not documents:
+            return []
+
+        vector_store = self._get_vector_store()
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+
+        start = 0
+        ids: List[str] = []
+        if vector_store.col is None:
+            # The first insert creates the collection from the document schema
+            start = min(INSERT_BATCH_SIZE, len(documents))
+            ids.extend(
+                vector_store.add_embeddings(
+                    texts=texts[:start],
+                    embeddings=vectors[:start],
+                    metadatas=metadatas[:start],
+                )
+            )
+
+        collection = vector_store.col
+        fields = [
+            field
+            for field in collection.schema.fields
+            if not (field.is_primary and field.auto_id)
+        ]
+        for i in range(start, len(documents), INSERT_BATCH_SIZE):
+            end = i + INSERT_BATCH_SIZE
+            batch_ids = [doc.id or str(uuid.uuid4()) for doc in documents[i:end]]
+            columns = []
+            for field in fields:
+                if field.name == vector_store._primary_field:
+                    columns.append(batch_ids)
+                elif field.name == vector_store._text_field:
+                    columns.append(texts[i:end])
+                elif field.name == vector_store._vector_field:
+                    columns.append(vectors[i:end])
+                else:
+                    columns.append(
+                        [metadata.get(field.name) for metadata in metadatas[i:end]]
+                    )
+
+            result = collection.insert(columns)
+            if vector_store.auto_id:
+                batch_ids = [str(pk) for pk in result.primary_keys]
+            ids.extend(batch_ids)
+
+        collection.flush()
+        return ids
+
     def add_documents(self, documents: List[Document]) -> List[str]:
         """Add documents to the vector store.
 
@@ -86,8 +175,24 @@ class MilvusCRUDManager:
         Returns:
             List of document IDs
         """
-        vector_store = self._get_vector_store()
-        return vector_store.add_documents(documents)
+        self._search_cache.clear()
+        texts = [doc.page_content for doc in documents]
+        vectors = embed_documents_batched(self.embedding_model, texts)
+        return self._add_embedded(documents, vectors)
+
+    async def aadd_documents(self, documents: List[Document]) -> List[str]:
+        """Asynchronously add documents to the vector store.
+
+        Args:
+            documents: List of Document objects to add
+
+        Returns:
+            List of document IDs
+        """
+        self._search_cache.clear()
+        texts = [doc.page_content for doc in documents]
+        vectors = await self._aembed_documents(texts)
+        return await asyncio.to_thread(self._add_embedded, documents, vectors)
 
     def delete_documents(self, ids: List[str]) -> bool:
         """Delete documents by IDs.
@@ -113,11 +218,92 @@ class MilvusCRUDManager:
             List of similar documents
         """
         vector_store = self._get_vector_store()
-        return vector_store.similarity_search(query, k=k)
+        embedding = self.embedding_model.embed_query(query)
+        cached = self._search_cache.lookup(embedding, k)
+        if cached is not None:
+            return cached
+
+        results = vector_store.similarity_search_by_vector(embedding, k=k)
+        self._search_cache.insert(embedding, k, results)
+        return results
+
+    def search_documents_batch(
+        self, queries: List[str], k: int = 4
+    ) -> List[List[Document]]:
+        """Search for documents similar to each of several queries.
+
+        All queries are embedded in one call and the cache misses are
+        searched in a single request.
+
+        Args:
+            queries: Query texts
+            k: Number of documents to return per query
+
+        Returns:
+            List of similar documents for each query, in query order
+        """
+        if not queries:
+            return []
+
+        embeddings = self.embedding_model.embed_documents(queries)
+        results = [self._search_cache.lookup(embedding, k) for embedding in embeddings]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if misses:
+            searched = self._search_by_vectors([embeddings[i] for i in misses], k)
+            for i, documents in zip(misses, searched):
+                self._search_cache.insert(embeddings[i], k, documents)
+                results[i] = documents
+
+        return [documents or [] for documents in results]
+
+    def _search_by_vectors(
+        self, vectors: List[List[float]], k: int
+    ) -> List[List[Document]]:
+        """Search all vectors in one batched collection search."""
+        # Make sure the collection exists and is loaded
+        vector_store = self._get_vector_store()
+        self._ensure_connection()
+
+        # Search the same field with the same index params as the store does
+        vector_field = vector_store._vector_field
+        search_params = vector_store.search_params
+        if isinstance(search_params, list):
+            search_params = search_params[0]
+
+        collection = Collection(self._get_collection_name())
+        output_fields = [
+            field.name
+            for field in collection.schema.fields
+            if field.name != vector_field
+        ]
+        results = collection.search(
+            data=vectors,
+            anns_field=vector_field,
+            param=search_params or {},
+            limit=k,
+            output_fields=output_fields,
+        )
 
-    def count_documents(self) -> int:
+        batch: List[List[Document]] = []
+        for hits in results:
+            documents = []
+            for hit in hits:
+                fields = {name: hit.entity.get(name) for name in output_fields}
+                text = fields.pop(vector_store._text_field, "")
+                documents.append(Document(page_content=text, metadata=fields))
+            batch.append(documents)
+        return batch
+
+    def count_documents(self, exact: bool = False) -> int:
         """Count the number of documents in the vector store.
 
+        The count is read from collection metadata without loading segments.
+        Rows inserted since the last flush are not included unless ``exact``
+        is set; ``add_documents`` already flushes once per call.
+
+        Args:
+            exact: Flush pending inserts before reading the count
+
         Returns:
             Number of documents
         """
@@ -127,19 +313,14 @@ class MilvusCRUDManager:
         collection_name = self._get_collection_name()
         if utility.has_collection(collection_name):
             collection = Collection(collection_name)
-            collection.load()
-            count = collection.num_entities
-            return count
+            if exact:
+                collection.flush()
+            return collection.num_entities
         else:
             return 0
 
     def clear_documents(self) -> None:
         """Remove all documents from the vector store."""
-        alias = "default"
-        self._ensure_connection(alias)
-
-        collection_name = self._get_collection_name()
-        if utility.has_collection(collection_name):
-            collection = Collection(collection_name)
-            # Delete all entities
-            collection.delete(expr="pk >= 0")
+        # Dropping the collection is a metadata operation, unlike deleting
+        # every entity which triggers per-segment compaction
+        self._drop()
@@ -10,16 +10,26 @@ MongoDB CRUD Manager
 
 from __future__ import annotations
 
+import asyncio
 import os
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 
 from langchain_core.documents import Document
 from langchain_mongodb.vectorstores import MongoDBAtlasVectorSearch
 from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
 
+from src.crud.semantic_cache import SemanticCache
+from src.log_util import logger
 from src.shared.configuration_manager import BaseConfiguration
-from src.shared.text_encoder import make_text_encoder
+from src.shared.index_cache import clear_index_cache
+from src.shared.text_encoder import (
+    aembed_documents_batched,
+    embed_documents_batched,
+    get_text_encoder,
+)
 
 
 class MongoDBCRUDManager:
@@ -28,10 +38,14 @@ class MongoDBCRUDManager:
     def __init__(self, configuration: BaseConfiguration):
         """Initialize the CRUD manager with a configuration."""
         self.configuration = configuration
-        self.embedding_model = make_text_encoder(configuration.embedding_model)
+        self.embedding_model = get_text_encoder(configuration.embedding_model)
         self._vector_store = None
+        self._search_cache = SemanticCache()
+        self._client: MongoClient | None = None
+        self._db_name, self._collection_name = self._parse_namespace()
 
-    def _parse_namespace(self) -> Tuple[str, str]:
+    @staticmethod
+    def _parse_namespace() -> Tuple[str, str]:
         """Parse database and collection names from namespace."""
         namespace = os.environ.get(
             "MONGODB_NAMESPACE", "langgraph_retrieval_agent.default"
@@ -47,14 +61,26 @@ class MongoDBCRUDManager:
         """Get MongoDB URI from environment variables."""
         return os.environ.get("MONGODB_URI", "mongodb://localhost:27017/")
 
-    @contextmanager
-    def _get_mongo_client(self):
-        """Context manager for MongoDB client."""
-        client = MongoClient(self._get_mongodb_uri())
-        try:
-            yield client
-        finally:
-            client.close()
+    def _get_mongo_client(self) -> MongoClient:
+        """Get the pooled MongoDB client, creating it on first use.
+
+        MongoClient is thread-safe and maintains its own connection pool, so a
+        single instance is shared by every operation on this manager.
+        """
+        if self._client is None:
+            self._client = MongoClient(
+                self._get_mongodb_uri(),
+                maxPoolSize=int(os.environ.get("MONGODB_MAX_POOL_SIZE", "50")),
+                minPoolSize=int(os.environ.get("MONGODB_MIN_POOL_SIZE", "5")),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled MongoDB client."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            self._vector_store = None
 
     def _get_vector_store(self) -> MongoDBAtlasVectorSearch:
         """Get MongoDB Atlas vector store."""
@@ -62,18 +88,12 @@ class MongoDBCRUDManager:
             # Check if we should use local MongoDB or MongoDB Atlas
             if self.configuration.retriever_provider == "mongodb-local":
                 # Local MongoDB setup
-                # Parse the MongoDB URI to extract connection parameters
-                mongodb_uri = self._get_mongodb_uri()
-                client = MongoClient(mongodb_uri)
-
-                # Parse database and collection names from namespace or use defaults
-                db_name, collection_name = self._parse_namespace()
-
-                db = client[db_name]
+                client = self._get_mongo_client()
+                db = client[self._db_name]
 
                 # Create the vector store with direct client connection
                 self._vector_store = MongoDBAtlasVectorSearch(
-                    collection=db[collection_name],
+                    collection=db[self._collection_name],
                     embedding=self.embedding_model,
                     index_name=os.environ.get("MONGODB_INDEX_NAME", "default_index"),
                     text_key="text",
@@ -95,19 +115,77 @@ class MongoDBCRUDManager:
         """Create index/collection in the vector store."""
         # MongoDB auto-creates collections when adding documents
         # This method exists for consistency
-        print(
+        logger.debug(
             f"Index creation not required for {self.configuration.retriever_provider}"
         )
 
+    def _drop_collection(self, keep_indexes: bool) -> None:
+        """Drop the collection, optionally recreating its indexes afterwards.
+
+        Dropping is a single metadata operation, unlike delete_many which
+        removes and logs every document. The collection is recreated on the
+        next insert.
+        """
+        client = self._get_mongo_client()
+        db = client[self._db_name]
+        collection = db[self._collection_name]
+
+        indexes = []
+        if keep_indexes:
+            indexes = [
+                (name, info)
+                for name, info in collection.index_information().items()
+                if name != "_id_"
+            ]
+
+        db.drop_collection(self._collection_name)
+
+        for name, info in indexes:
+            keys = info.pop("key")
+            info.pop("v", None)
+            info.pop("ns", None)
+            collection.create_index(keys, name=name, **info)
+        self._search_cache.clear()
+        clear_index_cache()
+
+    @staticmethod
+    def _has_search_indexes(collection: Collection) -> bool:
+        """Check whether the collection has Atlas (vector) search indexes."""
+        try:
+            return next(iter(collection.list_search_indexes()), None) is not None
+        except OperationFailure:
+            # Search indexes are only available on Atlas
+            return False
+
     def delete_index(self) -> None:
         """Delete the entire index/collection."""
-        # For MongoDB, delete all documents in the collection
-        db_name, collection_name = self._parse_namespace()
+        # For MongoDB, drop the collection together with its indexes
+        self._drop_collection(keep_indexes=False)
 
-        with self._get_mongo_client() as client:
-            db = client[db_name]
-            collection = db[collection_name]
-            collection.delete_many({})
+    async def _aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts without blocking the event loop."""
+        return await aembed_documents_batched(self.embedding_model, texts)
+
+    def _add_embedded(
+        self, documents: List[Document], vectors: List[List[float]]
+    ) -> List[str]:
+        """Insert documents with precomputed embeddings."""
+        vector_store = self._get_vector_store()
+        if not documents:
+            return []
+
+        # Insert precomputed embeddings directly, using the store's field layout
+        result = vector_store._collection.insert_many(
+            [
+                {
+                    **doc.metadata,
+                    vector_store._text_key: doc.page_content,
+                    vector_store._embedding_key: vector,
+                }
+                for doc, vector in zip(documents, vectors)
+            ]
+        )
+        return [str(_id) for _id in result.inserted_ids]
 
     def add_documents(self, documents: List[Document]) -> List[str]:
         """Add documents to the vector store.
@@ -118,8 +196,24 @@ class MongoDBCRUDManager:
         Returns:
             List of document IDs
         """
-        vector_store = self._get_vector_store()
-        return vector_store.add_documents(documents)
+        self._search_cache.clear()
+        texts = [doc.page_content for doc in documents]
+        vectors = embed_documents_batched(self.embedding_model, texts)
+        return self._add_embedded(documents, vectors)
+
+    async def aadd_documents(self, documents: List[Document]) -> List[str]:
+        """Asynchronously add documents to the vector store.
+
+        Args:
+            documents: List of Document objects to add
+
+        Returns:
+            List of document IDs
+        """
+        self._search_cache.clear()
+        texts = [doc.page_content for doc in documents]
+        vectors = await self._aembed_documents(texts)
+        return await asyncio.to_thread(self._add_embedded, documents, vectors)
 
     def delete_documents(self, ids: List[str]) -> bool:
         """Delete documents by IDs.
@@ -130,6 +224,7 @@ class MongoDBCRUDManager:
         Returns:
             True if successful
         """
+        self._search_cache.clear()
         vector_store = self._get_vector_store()
         if hasattr(vector_store, "delete"):
             vector_store.delete(ids)
@@ -150,27 +245,88 @@ class MongoDBCRUDManager:
             List of similar documents
         """
         vector_store = self._get_vector_store()
-        return vector_store.similarity_search(query, k=k)
+        embedding = self.embedding_model.embed_query(query)
+        cached = self._search_cache.lookup(embedding, k)
+        if cached is not None:
+            return cached
+
+        results = vector_store.similarity_search_by_vector(embedding, k=k)
+        self._search_cache.insert(embedding, k, results)
+        return results
+
+    def search_documents_batch(
+        self, queries: List[str], k: int = 4
+    ) -> List[List[Document]]:
+        """Search for documents similar to each of several queries.
+
+        All queries are embedded in one call and the cache misses are
+        searched in a single request.
+
+        Args:
+            queries: Query texts
+            k: Number of documents to return per query
+
+        Returns:
+            List of similar documents for each query, in query order
+        """
+        if not queries:
+            return []
+
+        embeddings = self.embedding_model.embed_documents(queries)
+        results = [self._search_cache.lookup(embedding, k) for embedding in embeddings]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if misses:
+            searched = self._search_by_vectors([embeddings[i] for i in misses], k)
+            for i, documents in zip(misses, searched):
+                self._search_cache.insert(embeddings[i], k, documents)
+                results[i] = documents
+
+        return [documents or [] for documents in results]
+
+    def _search_by_vectors(
+        self, vectors: List[List[float]], k: int
+    ) -> List[List[Document]]:
+        """Run one $vectorSearch per vector concurrently on the pooled client."""
+        # $vectorSearch accepts a single query vector per aggregation
+        vector_store = self._get_vector_store()
+        with ThreadPoolExecutor(max_workers=min(len(vectors), 8)) as pool:
+            return list(
+                pool.map(
+                    lambda vector: vector_store.similarity_search_by_vector(
+                        vector, k=k
+                    ),
+                    vectors,
+                )
+            )
 
-    def count_documents(self) -> int:
+    def count_documents(self, exact: bool = False) -> int:
         """Count the number of documents in the vector store.
 
+        Args:
+            exact: Scan the collection for an exact count instead of reading
+                the estimate from collection metadata
+
         Returns:
             Number of documents
         """
-        db_name, collection_name = self._parse_namespace()
-
-        with self._get_mongo_client() as client:
-            db = client[db_name]
-            collection = db[collection_name]
-            count = collection.count_documents({})
-            return count
+        client = self._get_mongo_client()
+        db = client[self._db_name]
+        collection = db[self._collection_name]
+        if exact:
+            return collection.count_documents({})
+        return collection.estimated_document_count()
 
     def clear_documents(self) -> None:
-        """Remove all documents from the vector store."""
-        db_name, collection_name = self._parse_namespace()
+        """Remove all documents from the vector store.
 
-        with self._get_mongo_client() as client:
-            db = client[db_name]
-            collection = db[collection_name]
+        Atlas rebuilds search indexes asynchronously after a drop, leaving
+        the store unsearchable for a while, so collections with search
+        indexes are emptied in place instead of dropped.
+        """
+        collection = self._get_mongo_client()[self._db_name][self._collection_name]
+        if self._has_search_indexes(collection):
             collection.delete_many({})
+            self._search_cache.clear()
+            clear_index_cache()
+        else:
+            self._drop_collection(keep_indexes=True)
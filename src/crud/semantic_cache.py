@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   semantic_cache.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+Semantic cache for vector store search results
+-----------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+CACHE_SIZE = int(os.environ.get("SEMANTIC_CACHE_SIZE", "1024"))
+CACHE_TTL = float(os.environ.get("SEMANTIC_CACHE_TTL", "300"))
+CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+
+class SemanticCache:
+    """Process-local cache of search results keyed by query embedding.
+
+    Query embeddings are L2-normalised and kept in a fixed-size FIFO buffer; a
+    lookup returns the results of the most similar cached query when its cosine
+    similarity exceeds the threshold and the entry has not expired.
+    """
+
+    def __init__(
+        self,
+        max_size: int = CACHE_SIZE,
+        ttl: float = CACHE_TTL,
+        threshold: float = CACHE_THRESHOLD,
+    ):
+        """Initialize an empty cache."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._vectors: np.ndarray | None = None
+        self._entries: List[tuple[float, int, List[Document]] | None] = [
+            None
+        ] * max_size
+        self._size = 0
+        self._next = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """L2-normalise an embedding."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(
+        self, embedding: List[float], k: int, tau: float | None = None
+    ) -> List[Document] | None:
+        """Look up cached results for a query embedding.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents requested
+            tau: Similarity threshold, defaults to the cache threshold
+
+        Returns:
+            Cached documents, or None on a miss
+        """
+        tau = self.threshold if tau is None else tau
+        query = self._normalize(embedding)
+
+        with self._lock:
+            if self._size == 0 or self._vectors is None:
+                return None
+            if self._vectors.shape[1] != query.shape[0]:
+                return None
+
+            scores = self._vectors[: self._size] @ query
+            best = int(np.argmax(scores))
+            entry = self._entries[best]
+            if entry is None or scores[best] < tau:
+                return None
+
+            expires_at, cached_k, documents = entry
+            if expires_at < time.monotonic() or cached_k < k:
+                return None
+            return documents[:k]
+
+    def insert(self, embedding: List[float], k: int, documents: List[Document]) -> None:
+        """Insert search results for a query embedding.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents requested
+            documents: Search results to cache
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros(
+                    (self.max_size, vector.shape[0]), dtype=np.float32
+                )
+                self._entries = [None] * self.max_size
+                self._size = 0
+                self._next = 0
+
+            self._vectors[self._next] = vector
+            self._entries[self._next] = (time.monotonic() + self.ttl, k, documents)
+            self._next = (self._next + 1) % self.max_size
+            self._size = min(self._size + 1, self.max_size)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._vectors = None
+            self._entries = [None] * self.max_size
+            self._size = 0
+            self._next = 0
@@ -8,18 +8,113 @@
 -----------------------------------------------------------
 """
 
-import json
-from typing import Optional
-
+import asyncio
+import hashlib
+import itertools
+import os
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+import ijson
+from langchain_core.documents import Document
 from langchain_core.runnables import RunnableConfig
+from langchain_core.vectorstores import VectorStoreRetriever
 from langgraph.graph import END, START, StateGraph
 
 from src.log_util import logger
 from src.shared.configuration_manager import IndexConfiguration
+from src.shared.index_cache import (
+    index_cache_path,
+    load_index_cache,
+    save_index_cache,
+)
 from src.shared.retrieval_manager import make_retriever
 from src.shared.state import IndexState, reduce_docs
 
 
+async def _add_documents_in_shards(
+    retriever: VectorStoreRetriever,
+    docs: list[Document],
+    concurrency: int,
+    create_store: bool = False,
+) -> None:
+    """将文档分片后并发写入向量存储。
+
+    文档按内容长度降序排列后轮询分配到各分片，使各分片的嵌入负载大致均衡。
+
+    Args:
+        retriever (VectorStoreRetriever): 用于写入文档的检索器。
+        docs (list[Document]): 要写入的文档列表。
+        concurrency (int): 分片数量及最大并发写入数。
+        create_store (bool): 索引或集合可能尚不存在。向量存储先检查是否存在再创建，
+            并发写入会重复创建而失败，因此先单独写入最短的一个文档完成创建。
+    """
+    docs = sorted(docs, key=lambda d: len(d.page_content), reverse=True)
+    if create_store and docs:
+        await retriever.aadd_documents([docs.pop()])
+    shards = [docs[i::concurrency] for i in range(concurrency)]
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _add_shard(shard_id: int, shard: list[Document]) -> None:
+        async with sem:
+            start = time.perf_counter()
+            await retriever.aadd_documents(shard)
+            logger.debug(
+                "分片 {} 已写入 {} 个文档，耗时 {:.2f}s",
+                shard_id,
+                len(shard),
+                time.perf_counter() - start,
+            )
+
+    await asyncio.gather(
+        *[_add_shard(i, shard) for i, shard in enumerate(shards) if shard]
+    )
+
+
+def _next_records(records: Iterator[dict], size: int) -> list[dict]:
+    """从解析器中读取至多 size 条记录。"""
+    return list(itertools.islice(records, size))
+
+
+async def _stream_docs(
+    path: str, batch_size: int = 512
+) -> AsyncIterator[list[Document]]:
+    """从JSON文件中流式读取文档，按批次产出。
+
+    使用 ijson 逐条解析顶层数组中的记录，文件读取与解析在线程中执行，
+    内存占用与批次大小而非文件大小成正比。
+
+    Args:
+        path (str): JSON文档文件路径，内容为文档对象数组。
+        batch_size (int): 每个批次的记录数。
+
+    Yields:
+        list[Document]: 经过 reduce_docs 处理的文档批次。
+    """
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        # use_float使小数解析为float而非Decimal，与json.load一致且可写入BSON
+        records = ijson.items(f, "item", use_float=True)
+        while True:
+            batch = await asyncio.to_thread(_next_records, records, batch_size)
+            if not batch:
+                break
+            yield reduce_docs([], batch)
+    finally:
+        f.close()
+
+
+def _file_signature(path: str) -> list[int]:
+    """以修改时间和文件大小作为文件指纹。"""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _content_hash(doc: Document) -> str:
+    """计算文档内容的哈希值。"""
+    return hashlib.sha1(doc.page_content.encode()).hexdigest()
+
+
 async def index_docs(
     state: IndexState, *, config: Optional[RunnableConfig] = None
 ) -> dict[str, str]:
@@ -44,31 +139,78 @@ async def index_docs(
 
     configuration = IndexConfiguration.from_runnable_config(config)
     logger.info(f"配置已加载: {configuration}")
+    concurrency = int(os.environ.get("INDEX_CONCURRENCY", "12"))
     docs = state.documents
 
-    if not docs:
-        logger.info(f"从文件加载文档: {configuration.docs_file}")
-        try:
-            with open(configuration.docs_file) as f:
-                serialized_docs = json.load(f)
-                docs = reduce_docs([], serialized_docs)
-            logger.debug(f"已加载 {len(docs)} 个文档")
-        except FileNotFoundError:
-            logger.warning(f"未找到文档文件: {configuration.docs_file}")
-            docs = []
-        except json.JSONDecodeError as e:
-            logger.error(f"解析JSON文档文件时出错: {e}")
-            docs = []
-
     if docs:
         logger.info("将文档添加到向量存储")
         try:
-            retriever = make_retriever(config)
-            await retriever.aadd_documents(docs)
+            retriever = await make_retriever(config)
+            await _add_documents_in_shards(
+                retriever, list(docs), concurrency, create_store=True
+            )
             logger.info("文档已成功添加到向量存储")
         except Exception as e:
             logger.error(f"将文档添加到向量存储时出错: {e}")
             raise
+        return {"documents": "delete"}
+
+    logger.info(f"从文件加载文档: {configuration.docs_file}")
+    cache_path = index_cache_path(configuration.docs_file, configuration)
+    cache = load_index_cache(cache_path)
+    try:
+        signature = _file_signature(configuration.docs_file)
+    except FileNotFoundError:
+        logger.warning(f"未找到文档文件: {configuration.docs_file}")
+        return {"documents": "delete"}
+
+    if cache.get("signature") == signature:
+        logger.info("文档文件未变化，跳过索引")
+        return {"documents": "delete"}
+
+    # 文档ID -> 内容哈希，用于在文件变化时只嵌入新增或修改过的文档
+    indexed: dict[str, str] = cache.get("documents", {})
+    total = 0
+    completed = False
+    try:
+        retriever = None
+        async for batch in _stream_docs(configuration.docs_file):
+            # 每个文档的内容只编码并哈希一次
+            hashes = {doc.metadata["uuid"]: _content_hash(doc) for doc in batch}
+            changed = [
+                doc
+                for doc in batch
+                if indexed.get(doc.metadata["uuid"]) != hashes[doc.metadata["uuid"]]
+            ]
+            if not changed:
+                continue
+            create_store = retriever is None
+            if create_store:
+                retriever = await make_retriever(config)
+            await _add_documents_in_shards(
+                retriever, changed, concurrency, create_store=create_store
+            )
+            indexed.update(
+                (doc.metadata["uuid"], hashes[doc.metadata["uuid"]]) for doc in changed
+            )
+            total += len(changed)
+            logger.debug("已索引 {} 个文档", total)
+        completed = True
+    except FileNotFoundError:
+        logger.warning(f"未找到文档文件: {configuration.docs_file}")
+    except ijson.JSONError as e:
+        logger.error(f"解析JSON文档文件时出错: {e}")
+    except Exception as e:
+        logger.error(f"将文档添加到向量存储时出错: {e}")
+        raise
+    finally:
+        save_index_cache(
+            cache_path,
+            {"signature": signature if completed else None, "documents": indexed},
+        )
+
+    if total:
+        logger.info(f"已将 {total} 个文档成功添加到向量存储")
     else:
         logger.info("没有文档需要索引")
 
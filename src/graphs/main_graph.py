@@ -12,56 +12,136 @@
 """
 
 import asyncio
-import os
-from typing import Any, List, Literal, TypedDict, cast
+import re
+from typing import Any, List, Literal, Optional, TypedDict, cast
 
-from langchain_core.messages import AnyMessage
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
-from langgraph.checkpoint.mongodb import AsyncMongoDBSaver
 from langgraph.graph import END, START, StateGraph
 
 from src.graphs.researcher_graph import researcher_graph
 from src.log_util import logger
+from src.shared.checkpointer import LazyCheckpointSaver, make_checkpointer
 from src.shared.configuration_manager import AgentConfiguration
 from src.shared.model_manager import model_manager
 from src.shared.state import AgentState, InputState, Router
+from src.shared.utils import copy_with_update, system_prefix, with_timeout_retry
 
 
-class ResearchPlan(TypedDict):
-    """研究计划结构。"""
+class RouteAndPlan(TypedDict):
+    """查询分类及研究计划结构。"""
 
+    router: Router
     steps: List[str]
 
 
-async def analyze_and_route_query(
+# 回复开头的路由标签
+ROUTE_TAGS = {"<RAG>": "rag-research", "<MORE>": "more-info", "<GEN>": "general"}
+# 推理模型（如qwen3）在回复前输出的思考内容
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+# 研究步骤行首的列表符号或序号
+_STEP_PREFIX_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)、])\s*")
+
+
+async def _route_by_tag(
+    state: AgentState, configuration: AgentConfiguration
+) -> Optional[dict[str, Any]]:
+    """根据回复开头的标签路由查询。
+
+    一般问题和追问的回复在同一次调用中生成，无需再调用一次模型。
+
+    参数:
+        state (AgentState): 代理的当前状态，包括对话历史。
+        configuration (AgentConfiguration): 代理配置。
+
+    返回:
+        Optional[dict[str, Any]]: 状态更新，无法解析标签时返回None。
+    """
+    messages = [
+        *system_prefix(
+            configuration.tagged_route_system_prompt, configuration.llm_model
+        ),
+        *state.messages,
+    ]
+    response = await model_manager.ainvoke(configuration.llm_model, messages)
+    if not isinstance(response.content, str):
+        return None
+
+    text = _THINK_RE.sub("", response.content).strip()
+    tag = next((tag for tag in ROUTE_TAGS if text.startswith(tag)), None)
+    if tag is None:
+        logger.debug("No route tag in response: {!r}", text[:32])
+        return None
+
+    router = Router(type=ROUTE_TAGS[tag], logic="")
+    body = text[len(tag) :].strip()
+    if router["type"] == "rag-research":
+        steps = [_STEP_PREFIX_RE.sub("", line).strip() for line in body.splitlines()]
+        steps = [step for step in steps if step]
+        return {"router": router, "steps": steps} if steps else None
+
+    if not body:
+        return {"router": router, "steps": []}
+    reply = copy_with_update(response, {"content": body})
+    return {"router": router, "steps": [], "messages": [reply]}
+
+
+async def analyze_and_plan(
     state: AgentState, *, config: RunnableConfig
-) -> dict[str, Router]:
-    """分析用户查询并将其路由到适当的处理器。
+) -> dict[str, Any]:
+    """分析用户查询并在需要研究时同时制定研究计划。
 
-    该函数使用语言模型将查询分类为以下三类之一：
+    该函数在一次语言模型调用中将查询分类为以下三类之一：
     - "more-info": 查询需要更多信息才能正确回答。
     - "rag-research": 查询与rag-research相关，应进行研究。
     - "general": 查询可以直接回答，无需研究。
 
+    分类为"rag-research"时同时生成逐步研究计划，其他分类的计划为空。
+    启用标签路由时，一般问题和追问的回复也在同一次调用中生成。
+
     参数:
         state (AgentState): 代理的当前状态，包括对话历史。
         config (RunnableConfig): 配置，包含用于查询分析的模型。
 
     返回:
-        dict[str, Router]: 包含'router'键的字典，其值为分类结果（分类类型和逻辑）。
+        dict[str, Any]: 包含'router'和'steps'键的字典，其值为分类结果和研究计划。
     """
-    logger.info("Analyzing and routing user query")
+    logger.info("Analyzing user query and planning research")
     configuration = AgentConfiguration.from_runnable_config(config)
+    if configuration.tagged_routing:
+        update = await _route_by_tag(state, configuration)
+        if update is not None:
+            logger.debug(
+                "Query routed by tag: {}, {} research steps",
+                update["router"]["type"],
+                len(update["steps"]),
+            )
+            return update
+        logger.debug("Falling back to structured routing")
+
     messages = [
-        {"role": "system", "content": configuration.router_system_prompt}
-    ] + state.messages
+        *system_prefix(
+            configuration.route_and_plan_system_prompt, configuration.llm_model
+        ),
+        *state.messages,
+    ]
 
-    model = model_manager.get_model(configuration.llm_model)
     response = cast(
-        Router, await model.with_structured_output(Router).ainvoke(messages)
+        RouteAndPlan,
+        await model_manager.ainvoke(
+            configuration.llm_model, messages, schema=RouteAndPlan, use_cache=True
+        ),
     )
-    logger.debug(f"Query routed with classification: {response['type']}")
-    return {"router": response}
+    router = response["router"]
+    steps = response.get("steps") or []
+    if router["type"] != "rag-research":
+        steps = []
+    logger.debug(
+        "Query routed with classification: {}, {} research steps",
+        router["type"],
+        len(steps),
+    )
+    return {"router": router, "steps": steps}
 
 
 async def ask_for_more_info(
@@ -81,10 +161,12 @@ async def ask_for_more_info(
     logger.info("Generating request for more information")
     configuration = AgentConfiguration.from_runnable_config(config)
     messages = [
-        {"role": "system", "content": configuration.more_info_system_prompt}
-    ] + state.messages
-    model = model_manager.get_model(configuration.llm_model)
-    response = await model.ainvoke(messages)
+        *system_prefix(configuration.more_info_system_prompt, configuration.llm_model),
+        *state.messages,
+    ]
+    response = await model_manager.ainvoke(
+        configuration.llm_model, messages, stream=True
+    )
     return {"messages": [response]}
 
 
@@ -105,38 +187,14 @@ async def respond_to_general_query(
     logger.info("Responding to general query")
     configuration = AgentConfiguration.from_runnable_config(config)
     response_system_prompt = configuration.response_system_prompt
-    messages = [{"role": "system", "content": response_system_prompt}] + state.messages
-    model = model_manager.get_model(configuration.llm_model)
-    response = await model.ainvoke(messages)
-    return {"messages": [response]}
-
-
-async def create_research_plan(
-    state: AgentState, *, config: RunnableConfig
-) -> dict[str, list[str]]:
-    """为LangChain相关查询创建研究计划。
-
-    该函数为回答LangChain相关查询生成逐步研究计划。
-
-    参数:
-        state (AgentState): 代理的当前状态。
-        config (RunnableConfig): 配置，包含用于生成研究计划的模型。
-
-    返回:
-        dict[str, list[str]]: 包含'steps'键的字典，其值为生成的研究计划。
-    """
-    logger.info("Creating research plan")
-    configuration = AgentConfiguration.from_runnable_config(config)
     messages = [
-        {"role": "system", "content": configuration.research_plan_system_prompt}
-    ] + state.messages
-
-    model = model_manager.get_model(configuration.llm_model)
-    response = cast(
-        ResearchPlan, await model.with_structured_output(ResearchPlan).ainvoke(messages)
+        *system_prefix(response_system_prompt, configuration.llm_model),
+        *state.messages,
+    ]
+    response = await model_manager.ainvoke(
+        configuration.llm_model, messages, stream=True
     )
-    logger.debug(f"Research plan created with {len(response['steps'])} steps")
-    return {"steps": response["steps"]}
+    return {"messages": [response]}
 
 
 async def conduct_research(
@@ -152,15 +210,46 @@ async def conduct_research(
 
     返回:
         dict[str, list[AnyMessage]]: 包含'next'键的字典，其值为流程中的下一步。
+
+    异常:
+        RuntimeError: 所有研究步骤均失败。
     """
     logger.info("Conducting research")
-    tasks = [
-        researcher_graph.ainvoke({"question": step}, config) for step in state.steps
-    ]
-    results = await asyncio.gather(*tasks)
-    documents = [
-        document for result in results for document in result.get("documents", [])
-    ]
+    configuration = AgentConfiguration.from_runnable_config(config)
+    semaphore = asyncio.Semaphore(configuration.research_concurrency)
+    # 同时限制子图内并行检索任务的数量
+    research_config: RunnableConfig = {
+        **config,
+        "max_concurrency": configuration.research_concurrency,
+    }
+
+    async def _research(step: str) -> dict[str, Any]:
+        async with semaphore:
+            return await with_timeout_retry(
+                lambda: researcher_graph.ainvoke({"question": step}, research_config),
+                configuration.research_step_timeout,
+            )
+
+    results = await asyncio.gather(
+        *[_research(step) for step in state.steps], return_exceptions=True
+    )
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if failures and len(failures) == len(results):
+        # 没有任何检索结果时不应基于空文档生成回答
+        raise RuntimeError(f"All {len(results)} research steps failed") from failures[0]
+
+    # 不同研究步骤常检索到相同的文档，按内容去重以减少响应的输入token
+    documents = []
+    seen = set()
+    for step, result in zip(state.steps, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Research step failed: {step}: {result!r}")
+            continue
+        for document in result.get("documents", []):
+            if document.page_content not in seen:
+                seen.add(document.page_content)
+                documents.append(document)
+    logger.debug("Collected {} unique documents", len(documents))
     return {"documents": documents}
 
 
@@ -182,34 +271,49 @@ async def respond(
     configuration = AgentConfiguration.from_runnable_config(config)
     system_prompt = configuration.response_system_prompt
     context = "\n\n".join([doc.page_content for doc in state.documents])
+    # 静态系统提示在前、检索结果并入最新问题，使提示前缀可被提供方缓存；
+    # 系统消息只出现在开头，Anthropic等不接受不连续的多条系统消息
+    docs = f"<docs>{context}</docs>"
+    last = state.messages[-1]
+    if isinstance(last.content, str):
+        content: Any = f"{docs}\n\n{last.content}"
+    else:
+        content = [{"type": "text", "text": docs}, *last.content]
     messages = [
-        {"role": "system", "content": system_prompt},
-        {
-            "role": "system",
-            "content": f"<docs>{context}</docs>",
-        },
-    ] + state.messages
-    model = model_manager.get_model(configuration.llm_model)
-    response = await model.ainvoke(messages)
+        *system_prefix(system_prompt, configuration.llm_model),
+        *state.messages[:-1],
+        HumanMessage(content=content),
+    ]
+    # 流式生成使调用方尽早收到首个token
+    response = await model_manager.ainvoke(
+        configuration.llm_model, messages, stream=True
+    )
     return {"messages": [response]}
 
 
 def route_query(
     state: AgentState,
-) -> Literal["ask_for_more_info", "respond_to_general_query", "create_research_plan"]:
+) -> Literal[
+    "ask_for_more_info", "respond_to_general_query", "conduct_research", "__end__"
+]:
     """根据分类结果路由查询。
 
     参数:
         state (AgentState): 代理的当前状态。
 
     返回:
-        Literal["ask_for_more_info", "respond_to_general_query", "create_research_plan"]: 要执行的下一个节点。
+        Literal["ask_for_more_info", "respond_to_general_query", "conduct_research", "__end__"]:
+            要执行的下一个节点，路由时已生成回复则结束。
     """
-    logger.debug(f"Routing based on classification: {state.router['type']}")
+    logger.debug("Routing based on classification: {}", state.router["type"])
+    if state.router["type"] != "rag-research" and isinstance(
+        state.messages[-1], AIMessage
+    ):
+        return END
     mapping = {
         "more-info": "ask_for_more_info",
         "general": "respond_to_general_query",
-        "rag-research": "create_research_plan",
+        "rag-research": "conduct_research",
     }
     return mapping[state.router["type"]]
 
@@ -229,27 +333,18 @@ def check_finished(state: AgentState) -> Literal["respond"]:
 
 # Define the Main Graph
 builder = StateGraph(AgentState, input=InputState, config_schema=AgentConfiguration)
-builder.add_node("analyze_and_route_query", analyze_and_route_query)
+builder.add_node("analyze_and_plan", analyze_and_plan)
 builder.add_node("ask_for_more_info", ask_for_more_info)
 builder.add_node("respond_to_general_query", respond_to_general_query)
-builder.add_node("create_research_plan", create_research_plan)
 builder.add_node("conduct_research", conduct_research)
 builder.add_node("respond", respond)
 
-builder.add_edge(START, "analyze_and_route_query")
-builder.add_conditional_edges("analyze_and_route_query", route_query)
-builder.add_edge("create_research_plan", "conduct_research")
+builder.add_edge(START, "analyze_and_plan")
+builder.add_conditional_edges("analyze_and_plan", route_query)
 builder.add_conditional_edges("conduct_research", check_finished)
 builder.add_edge("ask_for_more_info", END)
 builder.add_edge("respond_to_general_query", END)
 builder.add_edge("respond", END)
 
-if os.environ.get("MONGODB_URI"):
-    checkpointer = AsyncMongoDBSaver.from_conn_string(os.environ["MONGODB_URI"])
-else:
-    from langgraph.checkpoint.memory import MemorySaver
-
-    checkpointer = MemorySaver()
-
-main_graph = builder.compile(checkpointer=checkpointer)
+main_graph = builder.compile(checkpointer=LazyCheckpointSaver(make_checkpointer))
 main_graph.name = "MainGraph"
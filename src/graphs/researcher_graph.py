@@ -10,18 +10,80 @@
 -----------------------------------------------------------
 """
 
-from typing import TypedDict, cast
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Literal, Optional, TypedDict, Union, cast
 
 from langchain_core.documents import Document
 from langchain_core.runnables import RunnableConfig
+from langchain_core.vectorstores import VectorStore, VectorStoreRetriever
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Send
 
 from src.log_util import logger
 from src.shared.configuration_manager import AgentConfiguration
 from src.shared.model_manager import model_manager
-from src.shared.retrieval_manager import make_retriever
+from src.shared.retrieval_manager import make_retriever, retriever_config_key
 from src.shared.state import QueryState, ResearcherState
+from src.shared.utils import system_prefix, with_timeout_retry
+
+RETRIEVAL_CACHE_SIZE = int(os.environ.get("RETRIEVAL_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_TTL = float(os.environ.get("RETRIEVAL_CACHE_TTL", "60"))
+
+# (检索器配置键, 查询) -> (过期时间, 文档)
+_retrieval_cache: OrderedDict[tuple[tuple, str], tuple[float, list[Document]]] = (
+    OrderedDict()
+)
+
+
+def _get_cached(cache_key: tuple[tuple, str]) -> Optional[list[Document]]:
+    """读取未过期的检索结果缓存。"""
+    cached = _retrieval_cache.get(cache_key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def _cache_results(cache_key: tuple[tuple, str], documents: list[Document]) -> None:
+    """缓存检索结果，超出容量时淘汰最早的条目。"""
+    _retrieval_cache[cache_key] = (time.monotonic() + RETRIEVAL_CACHE_TTL, documents)
+    _retrieval_cache.move_to_end(cache_key)
+    while len(_retrieval_cache) > RETRIEVAL_CACHE_SIZE:
+        _retrieval_cache.popitem(last=False)
+
+
+def _supports_batch(retriever: VectorStoreRetriever) -> bool:
+    """判断检索器能否先批量嵌入查询、再按向量检索。
+
+    Elasticsearch（langchain-elasticsearch<0.3）未实现similarity_search_by_vector，
+    但提供带分数的按向量检索接口，同样可以走批量路径。
+    """
+    vectorstore = retriever.vectorstore
+    if retriever.search_type != "similarity" or vectorstore.embeddings is None:
+        return False
+    return hasattr(
+        vectorstore, "similarity_search_by_vector_with_relevance_scores"
+    ) or (
+        type(vectorstore).similarity_search_by_vector
+        is not VectorStore.similarity_search_by_vector
+    )
+
+
+async def _asearch_by_vector(
+    vectorstore: VectorStore, vector: list[float], search_kwargs: dict
+) -> list[Document]:
+    """按向量检索文档，根据向量存储提供的接口选择调用方式。"""
+    if hasattr(vectorstore, "similarity_search_by_vector_with_relevance_scores"):
+        kwargs = {k: v for k, v in search_kwargs.items() if k in ("k", "filter")}
+        docs_and_scores = await asyncio.to_thread(
+            vectorstore.similarity_search_by_vector_with_relevance_scores,
+            vector,
+            **kwargs,
+        )
+        return [doc for doc, _ in docs_and_scores]
+    return await vectorstore.asimilarity_search_by_vector(vector, **search_kwargs)
 
 
 class Response(TypedDict):
@@ -42,19 +104,23 @@ async def generate_queries(
     返回:
         dict[str, list[str]]: 包含'queries'键的字典，其值为生成的搜索查询列表。
     """
-    logger.debug(f"Generating search queries for question: {state.question}")
+    logger.debug("Generating search queries for question: {}", state.question)
 
     configuration = AgentConfiguration.from_runnable_config(config)
-    model = model_manager.get_model(configuration.llm_model).with_structured_output(
-        Response
-    )
     messages = [
-        {"role": "system", "content": configuration.generate_queries_system_prompt},
+        *system_prefix(
+            configuration.generate_queries_system_prompt, configuration.llm_model
+        ),
         {"role": "human", "content": state.question},
     ]
-    response = cast(Response, await model.ainvoke(messages))
+    response = cast(
+        Response,
+        await model_manager.ainvoke(
+            configuration.llm_model, messages, schema=Response, use_cache=True
+        ),
+    )
 
-    logger.debug(f"Generated {len(response['queries'])} queries")
+    logger.debug("Generated {} queries", len(response["queries"]))
     return {"queries": response["queries"]}
 
 
@@ -73,34 +139,113 @@ async def retrieve_documents(
         dict[str, list[Document]]: 包含'documents'键的字典，其值为检索到的文档列表。
     """
     logger.info("Retrieving documents")
-    logger.debug(f"Retrieving documents for query: {state.query}")
+    logger.debug("Retrieving documents for query: {}", state.query)
 
-    retriever = make_retriever(config)
-    response = await retriever.ainvoke(state.query, config)
-    logger.debug(f"Retrieved {len(response)} documents")
+    # 同一研究计划中重复的查询在短时间内直接复用检索结果
+    cache_key = (retriever_config_key(config), state.query)
+    cached = _get_cached(cache_key)
+    if cached is not None:
+        logger.debug("Using cached retrieval results")
+        return {"documents": cached}
+
+    configuration = AgentConfiguration.from_runnable_config(config)
+    retriever = await make_retriever(config)
+    response = await with_timeout_retry(
+        lambda: retriever.ainvoke(state.query, config),
+        configuration.research_step_timeout,
+    )
+    _cache_results(cache_key, response)
+    logger.debug("Retrieved {} documents", len(response))
     return {"documents": response}
 
 
-def retrieve_in_parallel(state: ResearcherState) -> list[Send]:
-    """为每个生成的查询创建并行检索任务。
+async def retrieve_batch(
+    state: ResearcherState, *, config: RunnableConfig
+) -> dict[str, list[Document]]:
+    """一次性为所有生成的查询检索文档。
 
-    该函数为研究者状态中的每个查询准备并行文档检索任务。
+    所有查询在一次请求中完成嵌入，再按research_concurrency限制并发按向量检索，
+    避免每个查询各自发起一次嵌入请求。
 
     参数:
         state (ResearcherState): 研究者的当前状态，包括生成的查询。
+        config (RunnableConfig): 配置，包含用于获取文档的检索器。
 
     返回:
-        Literal["retrieve_documents"]: Send对象列表，每个代表一个文档检索任务。
+        dict[str, list[Document]]: 包含'documents'键的字典，其值为去重后的文档列表。
+    """
+    logger.info(f"Retrieving documents for {len(state.queries)} queries in batch")
+    config_key = retriever_config_key(config)
+
+    results: dict[str, list[Document]] = {}
+    misses = []
+    for query in dict.fromkeys(state.queries):
+        cached = _get_cached((config_key, query))
+        if cached is None:
+            misses.append(query)
+        else:
+            results[query] = cached
+
+    if misses:
+        configuration = AgentConfiguration.from_runnable_config(config)
+        timeout = configuration.research_step_timeout
+        retriever = await make_retriever(config)
+        vectorstore = retriever.vectorstore
+        vectors = await with_timeout_retry(
+            lambda: vectorstore.embeddings.aembed_documents(misses), timeout
+        )
+        semaphore = asyncio.Semaphore(configuration.research_concurrency)
+
+        async def _search(vector: list[float]) -> list[Document]:
+            async with semaphore:
+                return await with_timeout_retry(
+                    lambda: _asearch_by_vector(
+                        vectorstore, vector, retriever.search_kwargs
+                    ),
+                    timeout,
+                )
+
+        searched = await asyncio.gather(*[_search(vector) for vector in vectors])
+        for query, documents in zip(misses, searched):
+            results[query] = documents
+            _cache_results((config_key, query), documents)
+
+    # 不同查询常命中相同的文档，按内容去重
+    documents = list(
+        {doc.page_content: doc for docs in results.values() for doc in docs}.values()
+    )
+    logger.debug("Retrieved {} unique documents", len(documents))
+    return {"documents": documents}
+
+
+async def retrieve_in_parallel(
+    state: ResearcherState, *, config: RunnableConfig
+) -> Union[Literal["retrieve_batch"], list[Send]]:
+    """为生成的查询选择检索方式。
+
+    向量存储支持按向量检索时，所有查询交给retrieve_batch节点一次处理；
+    否则为每个查询创建并行检索任务。
+
+    参数:
+        state (ResearcherState): 研究者的当前状态，包括生成的查询。
+        config (RunnableConfig): 配置，包含用于获取文档的检索器。
+
+    返回:
+        Union[Literal["retrieve_batch"], list[Send]]: "retrieve_batch"，
+        或Send对象列表，每个代表一个文档检索任务。
 
     行为:
-        - 为状态中的每个查询创建一个Send对象。
-        - 每个Send对象以相应的查询为目标，指向"retrieve_documents"节点。
+        - 检索器支持批量检索时返回"retrieve_batch"。
+        - 否则为状态中的每个查询创建一个Send对象，指向"retrieve_documents"节点。
     """
+    if _supports_batch(await make_retriever(config)):
+        return "retrieve_batch"
+
     logger.info(f"Preparing parallel retrieval for {len(state.queries)} queries")
     tasks = [
         Send("retrieve_documents", QueryState(query=query)) for query in state.queries
     ]
-    logger.debug(f"Created {len(tasks)} parallel retrieval tasks")
+    logger.debug("Created {} parallel retrieval tasks", len(tasks))
     return tasks
 
 
@@ -108,10 +253,16 @@ def retrieve_in_parallel(state: ResearcherState) -> list[Send]:
 builder = StateGraph(ResearcherState, config_schema=AgentConfiguration)
 builder.add_node("generate_queries", generate_queries)
 builder.add_node("retrieve_documents", retrieve_documents)
+builder.add_node("retrieve_batch", retrieve_batch)
 
 builder.add_edge(START, "generate_queries")
-builder.add_conditional_edges("generate_queries", retrieve_in_parallel)
+builder.add_conditional_edges(
+    "generate_queries", retrieve_in_parallel, ["retrieve_batch", "retrieve_documents"]
+)
 builder.add_edge("retrieve_documents", END)
+builder.add_edge("retrieve_batch", END)
 
-researcher_graph = builder.compile()
+# 研究子图的状态只由输入问题决定，失败时conduct_research整体重试，
+# 不继承主图的检查点存储，省去每个研究步骤的检查点写入
+researcher_graph = builder.compile(checkpointer=False)
 researcher_graph.name = "ResearcherGraph"
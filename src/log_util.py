@@ -8,6 +8,7 @@
 -----------------------------------------------------------
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -20,6 +21,8 @@ sys.path.append(project_root)
 
 fmt = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
 
+LOG_SERIALIZE = os.environ.get("LOG_SERIALIZE", "").lower() in ("1", "true")
+
 
 def setup_logger(name):
     LOG.add(
@@ -30,6 +33,9 @@ def setup_logger(name):
         level="INFO",  # 根据环境变量设置日志级别
         enqueue=True,  # 异步安全
         format=fmt,  # 日志格式
+        backtrace=False,  # 异常时不回溯调用链之外的栈帧
+        diagnose=False,  # 不在异常栈中展开变量值，避免格式化开销
+        serialize=LOG_SERIALIZE,  # 按需输出JSON格式
     )
     return LOG
 
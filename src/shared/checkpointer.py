@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   checkpointer.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+图检查点存储。
+
+设置MONGODB_URI时使用MongoDB，适用于分布式部署；
+否则使用本地LMDB文件，进程重启后状态不丢失。
+图在模块导入时编译，检查点存储在首次读写时才创建，导入模块不会打开文件或连接。
+-----------------------------------------------------------
+"""
+
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Sequence
+
+import lmdb
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.mongodb import MongoDBSaver
+from langgraph_checkpoint_lmdb import AsyncLMDBSaver
+
+from src.log_util import logger
+
+# 默认放在项目根目录下，不随当前工作目录变化
+CHECKPOINT_DIR = os.path.abspath(
+    os.environ.get(
+        "CHECKPOINT_DIR", str(Path(__file__).resolve().parents[2] / "checkpoints")
+    )
+)
+CHECKPOINT_MAP_SIZE = int(os.environ.get("CHECKPOINT_MAP_SIZE", str(2**31)))
+
+
+class LMDBCheckpointSaver(AsyncLMDBSaver):
+    """在当前运行的事件循环上执行读写的LMDB检查点存储。
+
+    AsyncLMDBSaver在构造时绑定事件循环，而图在模块导入时编译，
+    早于asyncio.run()创建的事件循环，因此改为每次调用时获取。
+    """
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """返回当前运行的事件循环。"""
+        return asyncio.get_running_loop()
+
+    @loop.setter
+    def loop(self, value: asyncio.AbstractEventLoop) -> None:
+        # 忽略父类构造时绑定的事件循环
+        pass
+
+
+class ThreadedMongoDBSaver(MongoDBSaver):
+    """在线程中执行同步读写的MongoDB检查点存储。
+
+    AsyncMongoDBSaver在构造时获取正在运行的事件循环，无法在模块导入时创建；
+    同步的MongoDBSaver未实现异步接口，因此将其同步方法放到线程中执行。
+    """
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """异步读取检查点。"""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self, config: Optional[RunnableConfig], **kwargs: Any
+    ) -> AsyncIterator[CheckpointTuple]:
+        """异步列出检查点。"""
+        items = await asyncio.to_thread(lambda: list(self.list(config, **kwargs)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """异步保存检查点。"""
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        *args: Any,
+    ) -> None:
+        """异步保存任务写入。"""
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, *args)
+
+
+def make_checkpointer() -> BaseCheckpointSaver:
+    """根据环境变量创建检查点存储。"""
+    if os.environ.get("MONGODB_URI"):
+        from pymongo import MongoClient
+
+        logger.info("Using MongoDB checkpointer")
+        return ThreadedMongoDBSaver(MongoClient(os.environ["MONGODB_URI"]))
+
+    env = lmdb.open(CHECKPOINT_DIR, max_dbs=10, map_size=CHECKPOINT_MAP_SIZE)
+    logger.info(f"Using LMDB checkpointer at {CHECKPOINT_DIR}")
+    return LMDBCheckpointSaver(env)
+
+
+class LazyCheckpointSaver(BaseCheckpointSaver):
+    """首次读写时才创建实际存储的检查点存储，读写均转发给实际存储。"""
+
+    def __init__(self, factory: Callable[[], BaseCheckpointSaver]) -> None:
+        """初始化。
+
+        Args:
+            factory (Callable[[], BaseCheckpointSaver]): 创建实际存储。
+        """
+        super().__init__()
+        self._factory = factory
+        self._saver: Optional[BaseCheckpointSaver] = None
+        self._lock = threading.Lock()
+
+    @property
+    def saver(self) -> BaseCheckpointSaver:
+        """返回实际存储，首次访问时创建。"""
+        if self._saver is None:
+            with self._lock:
+                if self._saver is None:
+                    self._saver = self._factory()
+        return self._saver
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """读取检查点。"""
+        return self.saver.get_tuple(config)
+
+    def list(
+        self, config: Optional[RunnableConfig], **kwargs: Any
+    ) -> Iterator[CheckpointTuple]:
+        """列出检查点。"""
+        return self.saver.list(config, **kwargs)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """保存检查点。"""
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        *args: Any,
+    ) -> None:
+        """保存任务写入。"""
+        self.saver.put_writes(config, writes, task_id, *args)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """删除会话的全部检查点。"""
+        self.saver.delete_thread(thread_id)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """异步读取检查点。"""
+        return await self.saver.aget_tuple(config)
+
+    async def alist(
+        self, config: Optional[RunnableConfig], **kwargs: Any
+    ) -> AsyncIterator[CheckpointTuple]:
+        """异步列出检查点。"""
+        async for item in self.saver.alist(config, **kwargs):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """异步保存检查点。"""
+        return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        *args: Any,
+    ) -> None:
+        """异步保存任务写入。"""
+        await self.saver.aput_writes(config, writes, task_id, *args)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """异步删除会话的全部检查点。"""
+        await self.saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[Any], channel: Any) -> Any:
+        """生成通道的下一个版本号，与实际存储一致。"""
+        return self.saver.get_next_version(current, channel)
@@ -73,7 +73,12 @@ T = TypeVar("T", bound=BaseConfiguration)
 
 @dataclass(kw_only=True)
 class AgentConfiguration(BaseConfiguration):
-    """The configuration for the agent."""
+    """The configuration for the agent.
+
+    The ``*_system_prompt`` fields are sent as the leading message of each
+    model call. Keep them byte-identical across calls so providers with
+    prefix prompt caching can reuse them.
+    """
 
     llm_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
         default="ollama/qwen3:4b",
@@ -82,9 +87,24 @@ class AgentConfiguration(BaseConfiguration):
         },
     )
 
-    router_system_prompt: str = field(
-        default=prompts.ROUTER_SYSTEM_PROMPT,
-        metadata={"description": "用于分类用户问题以将其路由到正确节点的系统提示。"},
+    route_and_plan_system_prompt: str = field(
+        default=prompts.ROUTE_AND_PLAN_SYSTEM_PROMPT,
+        metadata={
+            "description": "用于分类用户问题并在需要研究时同时制定研究计划的系统提示。"
+        },
+    )
+
+    tagged_routing: bool = field(
+        default=True,
+        metadata={
+            "description": "是否先以回复开头的标签路由查询，一般问题和追问在同一次调用中直接生成回复。"
+            "无法解析标签时回退到结构化输出。"
+        },
+    )
+
+    tagged_route_system_prompt: str = field(
+        default=prompts.TAGGED_ROUTE_SYSTEM_PROMPT,
+        metadata={"description": "用于以标签前缀路由用户问题并直接回复的系统提示。"},
     )
 
     more_info_system_prompt: str = field(
@@ -97,11 +117,6 @@ class AgentConfiguration(BaseConfiguration):
         metadata={"description": "用于响应一般问题的系统提示。"},
     )
 
-    research_plan_system_prompt: str = field(
-        default=prompts.RESEARCH_PLAN_SYSTEM_PROMPT,
-        metadata={"description": "用于根据用户的问题生成研究计划的系统提示。"},
-    )
-
     generate_queries_system_prompt: str = field(
         default=prompts.GENERATE_QUERIES_SYSTEM_PROMPT,
         metadata={
@@ -114,6 +129,19 @@ class AgentConfiguration(BaseConfiguration):
         metadata={"description": "用于生成响应的系统提示。"},
     )
 
+    research_concurrency: int = field(
+        default=4,
+        metadata={"description": "同时执行的研究步骤和检索任务的最大数量。"},
+    )
+
+    research_step_timeout: float = field(
+        default=120.0,
+        metadata={
+            "description": "单个研究步骤或检索任务的超时秒数，超时后重试一次。"
+            "研究步骤包含生成查询的模型调用，本地模型首次加载较慢，不宜过短。"
+        },
+    )
+
 
 class IndexConfiguration(BaseConfiguration):
     """Configuration class for indexing and retrieval operations.
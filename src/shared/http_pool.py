@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   http_pool.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+进程级共享的HTTP连接池。
+
+嵌入模型等HTTP客户端共用同一组连接，避免并发扇出时重复建立TCP/TLS连接。
+异步连接绑定在事件循环上，因此每个事件循环各有一个连接池；交给嵌入模型的
+客户端只负责把请求转发到当前的连接池，关闭连接池或切换事件循环后仍可使用。
+-----------------------------------------------------------
+"""
+
+import os
+from typing import Any, Optional
+
+import httpx
+
+from src.log_util import logger
+from src.shared.utils import LoopLocal
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", "128")),
+    max_keepalive_connections=int(os.environ.get("HTTP_POOL_MAX_KEEPALIVE", "64")),
+    keepalive_expiry=300,
+)
+
+
+def _new_async_client() -> httpx.AsyncClient:
+    """为当前事件循环创建异步连接池。"""
+    logger.debug("创建共享异步HTTP客户端")
+    return httpx.AsyncClient(limits=HTTP_LIMITS)
+
+
+_client: Optional[httpx.Client] = None
+_async_clients: LoopLocal[httpx.AsyncClient] = LoopLocal(_new_async_client)
+
+
+def _pooled_client() -> httpx.Client:
+    """返回同步连接池，关闭后再次调用时重新创建。"""
+    global _client
+    if _client is None or _client.is_closed:
+        logger.debug("创建共享同步HTTP客户端")
+        _client = httpx.Client(limits=HTTP_LIMITS)
+    return _client
+
+
+def _pooled_async_client() -> httpx.AsyncClient:
+    """返回当前事件循环的异步连接池，关闭后再次调用时重新创建。"""
+    client = _async_clients.get()
+    if client.is_closed:
+        _async_clients.pop()
+        client = _async_clients.get()
+    return client
+
+
+class _SharedClient(httpx.Client):
+    """把请求转发到共享同步连接池的客户端。"""
+
+    def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        """通过共享连接池发送请求。"""
+        return _pooled_client().send(request, **kwargs)
+
+
+class _SharedAsyncClient(httpx.AsyncClient):
+    """把请求转发到当前事件循环共享连接池的客户端。"""
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        """通过当前事件循环的共享连接池发送请求。"""
+        return await _pooled_async_client().send(request, **kwargs)
+
+
+_shared_client = _SharedClient()
+_shared_async_client = _SharedAsyncClient()
+
+
+def get_shared_client() -> httpx.Client:
+    """获取共享的同步HTTP客户端。"""
+    return _shared_client
+
+
+def get_shared_async_client() -> httpx.AsyncClient:
+    """获取共享的异步HTTP客户端，可在任意事件循环中使用。"""
+    return _shared_async_client
+
+
+async def aclose_shared_clients() -> None:
+    """关闭共享的同步连接池和当前事件循环的异步连接池。
+
+    之后的请求会重新建立连接池，已创建的嵌入模型仍可继续使用。
+    """
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+    client = _async_clients.pop()
+    if client is not None:
+        await client.aclose()
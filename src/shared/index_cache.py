@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   index_cache.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+文档索引缓存。
+
+记录文档文件已写入某个向量存储的文档及其内容哈希，文件未变化时跳过索引。
+清空或删除向量存储时必须同时清除缓存，否则之后的索引会被跳过。
+-----------------------------------------------------------
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+from src.log_util import logger
+from src.shared.configuration_manager import IndexConfiguration
+from src.shared.retrieval_manager import store_target
+from src.shared.utils import DOC_ID_SCHEME
+
+INDEX_CACHE_DIR = os.environ.get("INDEX_CACHE_DIR", ".index_cache")
+
+
+def index_cache_path(path: str, configuration: IndexConfiguration) -> str:
+    """返回文档文件在指定向量存储、嵌入模型与文档ID方案下的索引缓存文件路径。"""
+    key = "|".join(
+        [
+            os.path.abspath(path),
+            store_target(configuration),
+            configuration.embedding_model,
+            DOC_ID_SCHEME,
+        ]
+    )
+    return os.path.join(
+        INDEX_CACHE_DIR, f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+    )
+
+
+def load_index_cache(cache_path: str) -> dict:
+    """读取索引缓存，不存在或损坏时返回空缓存。"""
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_index_cache(cache_path: str, cache: dict) -> None:
+    """写入索引缓存。"""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(cache, f)
+
+
+def clear_index_cache() -> None:
+    """清除全部索引缓存，下次索引时重新写入所有文档。"""
+    if os.path.isdir(INDEX_CACHE_DIR):
+        shutil.rmtree(INDEX_CACHE_DIR, ignore_errors=True)
+        logger.info(f"已清除索引缓存: {INDEX_CACHE_DIR}")
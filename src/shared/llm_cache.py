@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   llm_cache.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+LLM响应缓存。
+
+以模型名称、消息和结构化输出模式为键缓存确定性的LLM调用结果，
+默认使用进程内存，设置LLM_CACHE_REDIS_URL时使用Redis。
+-----------------------------------------------------------
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from langchain_core.load import dumps, loads
+from langchain_core.messages import BaseMessage
+from langchain_core.utils.function_calling import convert_to_openai_function
+
+from src.log_util import logger
+
+LLM_CACHE_SIZE = int(os.environ.get("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", "3600"))
+
+
+def _message_key(message: Any) -> list[Any]:
+    """提取消息中参与缓存键计算的部分（角色和内容）。"""
+    if isinstance(message, BaseMessage):
+        return [message.type, message.content]
+    if isinstance(message, dict):
+        return [message.get("role"), message.get("content")]
+    return [None, str(message)]
+
+
+def cache_key(
+    model: str,
+    messages: Sequence[Any],
+    schema: Optional[Any] = None,
+    deterministic: bool = True,
+) -> Optional[str]:
+    """计算LLM调用的缓存键。
+
+    Args:
+        model (str): 格式为 'provider/model' 的模型名称。
+        messages (Sequence[Any]): 发送给模型的消息。
+        schema (Optional[Any]): 结构化输出模式。
+        deterministic (bool): 调用结果是否可复用，为False时不缓存。
+
+    Returns:
+        Optional[str]: 缓存键，不可缓存时返回None。
+    """
+    if not deterministic:
+        return None
+
+    payload = {
+        "model": model,
+        "messages": [_message_key(message) for message in messages],
+        "schema": convert_to_openai_function(schema) if schema is not None else None,
+    }
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """带过期时间的LLM响应缓存。
+
+    值以langchain的JSON序列化格式保存，命中时反序列化为新对象，
+    调用方修改返回值不会影响缓存内容。
+    """
+
+    def __init__(
+        self,
+        max_size: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL,
+        redis_url: Optional[str] = None,
+    ):
+        """初始化缓存。
+
+        Args:
+            max_size (int): 内存缓存的最大条目数。
+            ttl (float): 缓存条目的存活秒数。
+            redis_url (Optional[str]): Redis连接地址，为空时使用内存缓存。
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._redis = None
+
+        if redis_url:
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(redis_url)
+            logger.info("LLM cache backed by Redis")
+
+    async def get(self, key: str) -> Optional[Any]:
+        """读取缓存的响应，未命中或已过期时返回None。"""
+        if self._redis is not None:
+            data = await self._redis.get(f"llm_cache:{key}")
+            return loads(data) if data is not None else None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return loads(data)
+
+    async def set(self, key: str, value: Any) -> None:
+        """写入响应。"""
+        data = dumps(value)
+        if self._redis is not None:
+            await self._redis.set(f"llm_cache:{key}", data, ex=int(self.ttl))
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        """清空缓存。"""
+        if self._redis is not None:
+            async for key in self._redis.scan_iter("llm_cache:*"):
+                await self._redis.delete(key)
+            return
+
+        self._entries.clear()
+
+
+llm_cache = LLMCache(redis_url=os.environ.get("LLM_CACHE_REDIS_URL"))
@@ -1,11 +1,15 @@
 """Model manager for loading and caching chat models."""
 
-from typing import Dict, Optional
+import asyncio
+from typing import Any, Dict, Optional, Sequence
 
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import message_chunk_to_message
 
 from src.log_util import logger
+from src.shared.llm_cache import cache_key, llm_cache
+from src.shared.utils import LoopLocal
 
 
 def load_chat_model(fully_specified_name: str) -> BaseChatModel:
@@ -29,6 +33,7 @@ class ModelManager:
 
     _instance: Optional["ModelManager"] = None
     _models: Dict[str, BaseChatModel] = {}
+    _locks: LoopLocal[Dict[str, asyncio.Lock]] = LoopLocal(dict)
 
     def __new__(cls) -> "ModelManager":
         """Create a singleton instance."""
@@ -54,10 +59,96 @@ class ModelManager:
 
         return self._models[fully_specified_name]
 
+    async def aget_model(self, fully_specified_name: str) -> BaseChatModel:
+        """Get a chat model without blocking the event loop.
+
+        Concurrent callers asking for the same model wait for a single load.
+
+        Args:
+            fully_specified_name: String in the format 'provider/model'.
+
+        Returns:
+            The requested chat model.
+        """
+        model = self._models.get(fully_specified_name)
+        if model is not None:
+            return model
+
+        lock = self._locks.get().setdefault(fully_specified_name, asyncio.Lock())
+        async with lock:
+            if fully_specified_name not in self._models:
+                logger.info(f"Loading model: {fully_specified_name}")
+                self._models[fully_specified_name] = await asyncio.to_thread(
+                    load_chat_model, fully_specified_name
+                )
+        return self._models[fully_specified_name]
+
+    async def prewarm(self, fully_specified_names: Sequence[str]) -> None:
+        """Load models ahead of the first request.
+
+        Args:
+            fully_specified_names: Model names in the format 'provider/model'.
+        """
+        await asyncio.gather(*(self.aget_model(name) for name in fully_specified_names))
+
+    async def ainvoke(
+        self,
+        fully_specified_name: str,
+        messages: Sequence[Any],
+        schema: Optional[Any] = None,
+        use_cache: bool = False,
+        stream: bool = False,
+    ) -> Any:
+        """Invoke a chat model, optionally reusing cached responses.
+
+        Args:
+            fully_specified_name: String in the format 'provider/model'.
+            messages: Messages to send to the model.
+            schema: Optional structured output schema.
+            use_cache: Whether the response may be served from and stored
+                in the response cache. Only enable it for calls whose output
+                is fully determined by the input, such as structured
+                routing; sampled free-text generation must not be cached.
+            stream: Generate the response with ``astream`` so tokens reach
+                graph streams as they arrive. Ignored when a schema is given.
+
+        Returns:
+            The model message, or the structured output when a schema is given.
+        """
+        key = cache_key(fully_specified_name, messages, schema, use_cache)
+        if key is not None:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                logger.debug(f"LLM cache hit for model: {fully_specified_name}")
+                return cached
+
+        model = await self.aget_model(fully_specified_name)
+        if schema is not None:
+            response = await model.with_structured_output(schema).ainvoke(messages)
+        elif stream:
+            chunks = None
+            async for chunk in model.astream(messages):
+                chunks = chunk if chunks is None else chunks + chunk
+            if chunks is None:
+                logger.warning(
+                    f"Empty stream from model: {fully_specified_name}, "
+                    "retrying without streaming"
+                )
+                response = await model.ainvoke(messages)
+            else:
+                response = message_chunk_to_message(chunks)
+        else:
+            response = await model.ainvoke(messages)
+
+        if key is not None:
+            await llm_cache.set(key, response)
+        return response
+
     def clear_cache(self) -> None:
         """Clear the model cache."""
         logger.info("Clearing model cache")
         self._models.clear()
+        self._locks.clear()
 
 
 model_manager = ModelManager()
@@ -1,18 +1,44 @@
 """Retriever manager for loading and caching vector store retrievers."""
 
-import hashlib
-import json
+import asyncio
 import os
 from contextlib import contextmanager
-from typing import Dict, Generator, Optional
+from typing import Any, Dict, Generator, Hashable, Optional
 
 from langchain_core.embeddings import Embeddings
 from langchain_core.runnables import RunnableConfig
-from langchain_core.vectorstores import VectorStoreRetriever
+from langchain_core.vectorstores import VectorStore, VectorStoreRetriever
 
 from src.log_util import logger
 from src.shared.configuration_manager import BaseConfiguration
-from src.shared.text_encoder import make_text_encoder
+from src.shared.text_encoder import CachedEmbeddings, get_text_encoder
+from src.shared.utils import LoopLocal
+
+# Collection and namespace the Milvus and MongoDB retrievers read and write
+MILVUS_COLLECTION = "index"
+MONGODB_NAMESPACE = "langgraph_retrieval_agent.default"
+
+
+def store_target(configuration: BaseConfiguration) -> str:
+    """Identify the index or collection the configured retriever writes to.
+
+    Two configurations with the same target share the same stored documents.
+    The string may contain credentials from connection URIs; hash it before
+    persisting it.
+    """
+    provider = configuration.retriever_provider
+    if provider in ("elastic", "elastic-local"):
+        location = os.environ.get("ELASTICSEARCH_URL", "http://localhost:9200")
+        name = os.environ.get("ELASTICSEARCH_INDEX", "index")
+    elif provider == "milvus":
+        location = os.environ.get("MILVUS_URI", "http://localhost:19530")
+        name = MILVUS_COLLECTION
+    elif provider == "mongodb":
+        location = os.environ.get("MONGODB_URI", "")
+        name = MONGODB_NAMESPACE
+    else:
+        location, name = "", ""
+    return "|".join([provider, location, name])
 
 
 @contextmanager
@@ -71,7 +97,7 @@ def make_milvus_retriever(
         connection_args={
             "uri": os.environ.get("MILVUS_URI", "http://localhost:19530"),
         },
-        collection_name="index",
+        collection_name=MILVUS_COLLECTION,
     )
 
     logger.info("Milvus retriever setup complete")
@@ -88,7 +114,7 @@ def make_mongodb_retriever(
 
     vstore = MongoDBAtlasVectorSearch.from_connection_string(
         os.environ["MONGODB_URI"],
-        namespace="langgraph_retrieval_agent.default",
+        namespace=MONGODB_NAMESPACE,
         embedding=embedding_model,
     )
 
@@ -96,11 +122,22 @@ def make_mongodb_retriever(
     yield vstore.as_retriever(search_kwargs=configuration.search_kwargs)
 
 
+def _freeze(value: Any) -> Hashable:
+    """Convert nested dicts and lists into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
 class RetrieverManager:
     """A singleton class to manage and cache vector store retrievers."""
 
     _instance: Optional["RetrieverManager"] = None
-    _retrievers: Dict[str, VectorStoreRetriever] = {}
+    _retrievers: Dict[tuple, VectorStoreRetriever] = {}
+    _vectorstores: Dict[tuple, VectorStore] = {}
+    _locks: LoopLocal[Dict[tuple, asyncio.Lock]] = LoopLocal(dict)
 
     def __new__(cls) -> "RetrieverManager":
         """Create a singleton instance."""
@@ -109,18 +146,15 @@ class RetrieverManager:
             logger.debug("[RetrieverManager] >>> instance created")
         return cls._instance
 
-    def _generate_config_key(self, config: RunnableConfig) -> str:
+    def _generate_config_key(self, config: RunnableConfig) -> tuple:
         """Generate a unique key for the configuration."""
         configuration = BaseConfiguration.from_runnable_config(config)
-        # Create a dictionary with the relevant config parameters
-        config_dict = {
-            "retriever_provider": configuration.retriever_provider,
-            "embedding_model": configuration.embedding_model,
-            "search_kwargs": configuration.search_kwargs,
-        }
-        # Convert to JSON and hash it to create a unique key
-        config_str = json.dumps(config_dict, sort_keys=True)
-        return hashlib.md5(config_str.encode()).hexdigest()
+        # A plain tuple is hashed natively, no serialization needed
+        return (
+            configuration.retriever_provider,
+            configuration.embedding_model,
+            _freeze(configuration.search_kwargs),
+        )
 
     def get_retriever(self, config: RunnableConfig) -> VectorStoreRetriever:
         """Get a retriever, creating it if necessary."""
@@ -137,6 +171,28 @@ class RetrieverManager:
 
         return self._retrievers[config_key]
 
+    async def aget_retriever(self, config: RunnableConfig) -> VectorStoreRetriever:
+        """Get a retriever, creating it in a worker thread if necessary.
+
+        Vector store construction opens connections synchronously, so it runs
+        off the event loop; concurrent callers with the same configuration
+        wait for a single construction.
+        """
+        config_key = self._generate_config_key(config)
+        if config_key in self._retrievers:
+            return self._retrievers[config_key]
+
+        lock = self._locks.get().setdefault(config_key, asyncio.Lock())
+        async with lock:
+            if config_key not in self._retrievers:
+                logger.info(
+                    f"[RetrieverManager] >>> Creating new retriever for config key: {config_key}"
+                )
+                self._retrievers[config_key] = await asyncio.to_thread(
+                    self._create_retriever, config
+                )
+        return self._retrievers[config_key]
+
     def _create_retriever(self, config: RunnableConfig) -> VectorStoreRetriever:
         """Create a new retriever based on the configuration."""
         configuration = BaseConfiguration.from_runnable_config(config)
@@ -144,25 +200,33 @@ class RetrieverManager:
             f"[RetrieverManager] >>> Creating retriever with provider: {configuration.retriever_provider}"
         )
 
-        embedding_model = make_text_encoder(configuration.embedding_model)
+        # Vector stores hold the connection pools; retrievers differing only in
+        # search_kwargs share one store
+        store_key = (configuration.retriever_provider, configuration.embedding_model)
+        if store_key in self._vectorstores:
+            logger.debug("[RetrieverManager] >>> Reusing cached vector store")
+            return self._vectorstores[store_key].as_retriever(
+                search_kwargs=configuration.search_kwargs
+            )
+
+        embedding_model = CachedEmbeddings(
+            get_text_encoder(configuration.embedding_model)
+        )
         logger.debug(
             f"[RetrieverManager] >>> Using embedding model: {configuration.embedding_model}"
         )
 
         if configuration.retriever_provider in ("elastic", "elastic-local"):
             logger.debug("[RetrieverManager] >>> Using Elasticsearch retriever")
-            with make_elastic_retriever(configuration, embedding_model) as retriever:
-                return retriever
+            make_vectorstore_retriever = make_elastic_retriever
 
         elif configuration.retriever_provider == "milvus":
             logger.debug("[RetrieverManager] >>> Using Milvus retriever")
-            with make_milvus_retriever(configuration, embedding_model) as retriever:
-                return retriever
+            make_vectorstore_retriever = make_milvus_retriever
 
         elif configuration.retriever_provider == "mongodb":
             logger.debug("[RetrieverManager] >>> Using MongoDB retriever")
-            with make_mongodb_retriever(configuration, embedding_model) as retriever:
-                return retriever
+            make_vectorstore_retriever = make_mongodb_retriever
 
         else:
             logger.error(
@@ -174,19 +238,30 @@ class RetrieverManager:
                 f"Got: {configuration.retriever_provider}"
             )
 
+        with make_vectorstore_retriever(configuration, embedding_model) as retriever:
+            self._vectorstores[store_key] = retriever.vectorstore
+            return retriever
+
     def clear_cache(self) -> None:
         """Clear the retriever cache."""
         logger.info("[RetrieverManager] >>> Clearing retriever cache")
         self._retrievers.clear()
+        self._vectorstores.clear()
+        self._locks.clear()
 
 
 retriever_manager = RetrieverManager()
 
 
-def make_retriever(config: RunnableConfig) -> VectorStoreRetriever:
+def retriever_config_key(config: RunnableConfig) -> tuple:
+    """Return the key identifying the retriever used for this configuration."""
+    return retriever_manager._generate_config_key(config)
+
+
+async def make_retriever(config: RunnableConfig) -> VectorStoreRetriever:
     """Create a retriever for the agent, based on the current configuration.
 
     This function uses a retriever manager to cache and reuse retriever instances
     to avoid repeated setup overhead.
     """
-    return retriever_manager.get_retriever(config)
+    return await retriever_manager.aget_retriever(config)
@@ -12,7 +12,7 @@ from langgraph.graph import add_messages
 from src.shared.utils import reduce_docs
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphState:
     """代理的共享状态。"""
 
@@ -25,14 +25,14 @@ class GraphState:
     response: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryState:
     """研究者图中retrieve_documents节点的私有状态。"""
 
     query: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ResearcherState:
     """研究者图的状态。"""
 
@@ -44,7 +44,7 @@ class ResearcherState:
     """由检索器填充。这是代理可以引用的文档列表。"""
 
 
-@dataclass
+@dataclass(slots=True)
 class InputState:
     """代理的输入状态。
 
@@ -64,7 +64,7 @@ class Router(TypedDict):
     type: Literal["more-info", "rag-research", "general"]
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentState(InputState):
     """检索图/代理的状态。"""
 
@@ -76,7 +76,7 @@ class AgentState(InputState):
     """由检索器填充。这是代理可以引用的文档列表。"""
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexState:
     """索引图的状态。"""
 
@@ -8,9 +8,25 @@
 -----------------------------------------------------------
 """
 
+import asyncio
+import functools
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
 from langchain_core.embeddings import Embeddings
 
 from src.log_util import logger
+from src.shared.http_pool import (
+    HTTP_LIMITS,
+    aclose_shared_clients,
+    get_shared_async_client,
+    get_shared_client,
+)
+
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "2048"))
 
 
 def make_text_encoder(model: str) -> Embeddings:
@@ -21,11 +37,184 @@ def make_text_encoder(model: str) -> Embeddings:
     if provider == "openai":
         from langchain_openai import OpenAIEmbeddings
 
-        return OpenAIEmbeddings(model=model)
+        return OpenAIEmbeddings(
+            model=model,
+            http_client=get_shared_client(),
+            http_async_client=get_shared_async_client(),
+        )
     elif provider == "ollama":
         from langchain_ollama import OllamaEmbeddings
 
-        return OllamaEmbeddings(model=model, base_url="http://localhost:11434")
+        # ollama 客户端自行创建 httpx 客户端，这里只能传入连接池限制
+        return OllamaEmbeddings(
+            model=model,
+            base_url="http://localhost:11434",
+            client_kwargs={"limits": HTTP_LIMITS},
+        )
     else:
         logger.error(f"不支持的嵌入提供者: {provider}")
         raise ValueError(f"不支持的嵌入提供者: {provider}")
+
+
+class CachedEmbeddings(Embeddings):
+    """带LRU缓存的文本编码器包装。
+
+    查询和文档的嵌入分别缓存，重复或重叠的查询直接返回缓存的向量。
+    """
+
+    def __init__(
+        self,
+        encoder: Embeddings,
+        maxsize: int = EMBEDDING_CACHE_SIZE,
+    ):
+        """初始化缓存。
+
+        Args:
+            encoder (Embeddings): 被包装的文本编码器。
+            maxsize (int): 查询和文档缓存各自的最大条目数。
+        """
+        self.encoder = encoder
+        self.maxsize = maxsize
+        self._queries: OrderedDict[str, List[float]] = OrderedDict()
+        self._documents: OrderedDict[str, List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, cache: OrderedDict, text: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = cache.get(text)
+            if vector is not None:
+                cache.move_to_end(text)
+            return vector
+
+    def _put(self, cache: OrderedDict, text: str, vector: List[float]) -> List[float]:
+        with self._lock:
+            cache[text] = vector
+            cache.move_to_end(text)
+            while len(cache) > self.maxsize:
+                cache.popitem(last=False)
+        return vector
+
+    def embed_query(self, text: str) -> List[float]:
+        """嵌入查询文本。"""
+        vector = self._get(self._queries, text)
+        if vector is None:
+            vector = self._put(self._queries, text, self.encoder.embed_query(text))
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """异步嵌入查询文本。"""
+        vector = self._get(self._queries, text)
+        if vector is None:
+            vector = self._put(
+                self._queries, text, await self.encoder.aembed_query(text)
+            )
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """嵌入文档文本，仅对未缓存的文本调用编码器。"""
+        vectors = [self._get(self._documents, text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.encoder.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = self._put(self._documents, texts[i], vector)
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """异步嵌入文档文本，仅对未缓存的文本调用编码器。"""
+        vectors = [self._get(self._documents, text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = await self.encoder.aembed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = self._put(self._documents, texts[i], vector)
+        return vectors
+
+
+@functools.lru_cache(maxsize=8)
+def get_text_encoder(model: str) -> Embeddings:
+    """获取按模型名称缓存的文本编码器，同一进程内的多个调用方共享同一实例。"""
+    return make_text_encoder(model)
+
+
+async def aclose_text_encoders() -> None:
+    """关闭共享HTTP连接池并清空编码器缓存，之后获取的编码器重新创建。"""
+    await aclose_shared_clients()
+    get_text_encoder.cache_clear()
+
+
+def _length_sorted_batches(texts: List[str], batch_size: int) -> List[List[int]]:
+    """按文本长度排序后将下标切分为批次，使同一批次内的文本长度相近。"""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    return [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def embed_documents_batched(
+    encoder: Embeddings,
+    texts: List[str],
+    batch_size: int = 64,
+    concurrency: int = 8,
+) -> List[List[float]]:
+    """按长度排序的微批次并发计算文档嵌入。
+
+    Args:
+        encoder (Embeddings): 文本编码器。
+        texts (List[str]): 要嵌入的文本。
+        batch_size (int): 每个批次的文本数量。
+        concurrency (int): 最大并发批次数。
+
+    Returns:
+        List[List[float]]: 与输入顺序一致的嵌入向量。
+    """
+    batches = _length_sorted_batches(texts, batch_size)
+    vectors: List[List[float]] = [[] for _ in texts]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = pool.map(
+            lambda batch: encoder.embed_documents([texts[i] for i in batch]), batches
+        )
+        for batch, batch_vectors in zip(batches, results):
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+
+    logger.debug(f"已分 {len(batches)} 个批次嵌入 {len(texts)} 个文本")
+    return vectors
+
+
+async def aembed_documents_batched(
+    encoder: Embeddings,
+    texts: List[str],
+    batch_size: int = 64,
+    concurrency: int = 8,
+) -> List[List[float]]:
+    """按长度排序的微批次异步并发计算文档嵌入。
+
+    Args:
+        encoder (Embeddings): 文本编码器。
+        texts (List[str]): 要嵌入的文本。
+        batch_size (int): 每个批次的文本数量。
+        concurrency (int): 最大并发批次数。
+
+    Returns:
+        List[List[float]]: 与输入顺序一致的嵌入向量。
+    """
+    batches = _length_sorted_batches(texts, batch_size)
+    sem = asyncio.Semaphore(concurrency)
+    # 仅提供同步实现的编码器在线程中运行，避免阻塞事件循环
+    native_async = type(encoder).aembed_documents is not Embeddings.aembed_documents
+
+    async def _embed(batch: List[int]) -> List[List[float]]:
+        batch_texts = [texts[i] for i in batch]
+        async with sem:
+            if native_async:
+                return await encoder.aembed_documents(batch_texts)
+            return await asyncio.to_thread(encoder.embed_documents, batch_texts)
+
+    results = await asyncio.gather(*[_embed(batch) for batch in batches])
+    vectors: List[List[float]] = [[] for _ in texts]
+    for batch, batch_vectors in zip(batches, results):
+        for i, vector in zip(batch, batch_vectors):
+            vectors[i] = vector
+
+    logger.debug(f"已分 {len(batches)} 个批次嵌入 {len(texts)} 个文本")
+    return vectors
@@ -2,16 +2,78 @@
 
 函数:
     format_docs: 将文档转换为xml格式的字符串。
+    make_system_message: 构造可被提供方前缀缓存命中的系统消息。
+    system_prefix: 缓存的单条系统消息元组，用于拼接节点的消息列表。
+    with_timeout_retry: 带超时的异步调用，超时后重试。
+    copy_with_update: 复制消息或文档并替换部分字段，兼容pydantic v1和v2。
+    LoopLocal: 按事件循环分别保存的锁、信号量等对象。
 """
 
+import asyncio
+import functools
 import hashlib
-import uuid
-from typing import Any, Literal, Optional, Union
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Literal,
+    Optional,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from langchain_core.documents import Document
 
 from src.log_util import logger
 
+T = TypeVar("T")
+
+# 文档ID方案。md5为历史方案；blake2b计算更快，但会改变所有文档的ID，
+# 已写入向量存储和检查点的文档将无法与新文档去重。切换前需清空向量存储
+# （clear_documents会同时清除索引缓存）并删除检查点，再重新索引
+DOC_ID_SCHEME = os.environ.get("DOC_ID_SCHEME", "md5").lower()
+_ID_HASHERS: dict[str, Callable[[], Any]] = {
+    "md5": lambda: hashlib.md5(usedforsecurity=False),
+    "blake2b": lambda: hashlib.blake2b(digest_size=16, usedforsecurity=False),
+}
+if DOC_ID_SCHEME not in _ID_HASHERS:
+    raise ValueError(
+        f"不支持的DOC_ID_SCHEME: {DOC_ID_SCHEME}，可选值: {', '.join(_ID_HASHERS)}"
+    )
+# 预先初始化的哈希对象，每次复制状态比重新构造更快
+_ID_HASH_TEMPLATE = _ID_HASHERS[DOC_ID_SCHEME]()
+
+_EMPTY_DOCS = "<documents></documents>"
+_DOC_OPEN = "<documents>\n"
+_DOC_CLOSE = "\n</documents>"
+
+# hashlib对不小于2048字节的输入会释放GIL，只有大批量的长文本才值得分发到线程池
+_HASH_POOL_MIN_BATCH = 32
+_HASH_POOL_MIN_AVG_LEN = 2048
+_HASH_POOL_WORKERS = os.cpu_count() or 1
+_hash_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _fmt_attr(value: Any) -> str:
+    """将元数据值格式化为XML属性值，字符串加双引号并转义。"""
+    t = type(value)
+    if t is str:
+        return '"' + value.replace("&", "&amp;").replace('"', "&quot;") + '"'
+    if t is int or t is float or t is bool:
+        return str(value)
+    return repr(value)
+
+
+def _xml_escape(text: str) -> str:
+    """转义文本中的XML特殊字符。"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
 
 def _format_doc(doc: Document) -> str:
     """将单个文档格式化为XML。
@@ -22,13 +84,16 @@ def _format_doc(doc: Document) -> str:
     Returns:
         str: 格式化后的XML字符串文档。
     """
-    logger.debug("格式化文档")
-    metadata = doc.metadata or {}
-    meta = "".join(f" {k}={v!r}" for k, v in metadata.items())
-    if meta:
-        meta = f" {meta}"
-
-    return f"<document{meta}>\n{doc.page_content}\n</document>"
+    meta_parts = [f" {k}={_fmt_attr(v)}" for k, v in (doc.metadata or {}).items()]
+    return "".join(
+        (
+            "<document",
+            *meta_parts,
+            ">\n",
+            _xml_escape(doc.page_content),
+            "\n</document>",
+        )
+    )
 
 
 def format_docs(docs: Optional[list[Document]]) -> str:
@@ -57,24 +122,223 @@ def format_docs(docs: Optional[list[Document]]) -> str:
         >>> print(format_docs(None))
         <documents></documents>
     """
-    doc_count = len(docs) if docs else 0
-    logger.debug(f"将 {doc_count} 个文档格式化为XML")
-
     if not docs:
-        return "<documents></documents>"
-    formatted = "\n".join(_format_doc(doc) for doc in docs)
-    result = f"""<documents>
-{formatted}
-</documents>"""
+        return _EMPTY_DOCS
+
+    logger.debug("将 {} 个文档格式化为XML", len(docs))
+    return _DOC_OPEN + "\n".join([_format_doc(doc) for doc in docs]) + _DOC_CLOSE
+
+
+def make_system_message(prompt: str, llm_model: str) -> dict[str, Any]:
+    """构造系统消息。
+
+    OpenAI等提供方会自动缓存相同的提示前缀；Anthropic需要在内容块上
+    显式标记cache_control才会缓存。
+
+    Args:
+        prompt (str): 系统提示，跨调用保持不变才能命中缓存。
+        llm_model (str): 格式为 'provider/model' 的模型名称。
+
+    Returns:
+        dict[str, Any]: 系统消息字典。
+    """
+    if llm_model.startswith("anthropic/"):
+        content: Any = [
+            {"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}
+        ]
+    else:
+        content = prompt
+    return {"role": "system", "content": content}
+
+
+@functools.lru_cache(maxsize=16)
+def system_prefix(prompt: str, llm_model: str) -> tuple[dict[str, Any], ...]:
+    """返回只包含系统消息的元组，同一提示只构造一次。
+
+    用法为 ``[*system_prefix(prompt, llm_model), *state.messages]``，
+    返回的消息对象在调用间共享，不应修改。
+
+    Args:
+        prompt (str): 系统提示。
+        llm_model (str): 格式为 'provider/model' 的模型名称。
+
+    Returns:
+        tuple[dict[str, Any], ...]: 系统消息元组。
+    """
+    return (make_system_message(prompt, llm_model),)
+
+
+async def with_timeout_retry(
+    func: Callable[[], Awaitable[T]], timeout: float, retries: int = 1
+) -> T:
+    """执行异步调用，超时后重新发起。
+
+    慢请求通常是个别现象，取消后重新发起往往比继续等待更快返回。
+
+    Args:
+        func (Callable[[], Awaitable[T]]): 每次调用返回一个新的协程。
+        timeout (float): 单次调用的超时秒数。
+        retries (int): 超时后的重试次数。
+
+    Returns:
+        T: 调用结果。
+
+    Raises:
+        TimeoutError: 所有尝试均超时。
+    """
+    for attempt in range(retries):
+        try:
+            return await asyncio.wait_for(func(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"调用超时（{timeout}s），第 {attempt + 1} 次重试")
+    return await asyncio.wait_for(func(), timeout=timeout)
+
+
+class LoopLocal(Generic[T]):
+    """按事件循环分别保存的对象。
+
+    asyncio的锁、信号量和异步HTTP连接绑定在首次使用它们的事件循环上。
+    进程中多次调用asyncio.run（测试、脚本、notebook）时，每个事件循环
+    需要各自的实例；事件循环被回收后对应的实例随之释放。
+    """
 
-    logger.debug("文档格式化完成")
-    return result
+    def __init__(self, factory: Callable[[], T]) -> None:
+        """初始化。
+
+        Args:
+            factory (Callable[[], T]): 为新的事件循环创建实例。
+        """
+        self._factory = factory
+        self._values: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self) -> T:
+        """返回当前事件循环的实例，首次调用时创建。"""
+        loop = asyncio.get_running_loop()
+        value = self._values.get(loop)
+        if value is None:
+            value = self._values[loop] = self._factory()
+        return value
+
+    def pop(self) -> Optional[T]:
+        """移除并返回当前事件循环的实例，不存在时返回None。"""
+        return self._values.pop(asyncio.get_running_loop(), None)
+
+
+def copy_with_update(obj: T, update: dict[str, Any]) -> T:
+    """浅复制消息或文档对象并替换指定字段。
+
+    langchain-core 0.3起消息和文档为pydantic v2模型（model_copy），
+    此前为v1模型（copy），两者都只复制顶层字段。
+
+    Args:
+        obj (T): 要复制的pydantic模型实例。
+        update (dict[str, Any]): 要替换的字段。
+
+    Returns:
+        T: 替换字段后的新对象。
+    """
+    model_copy = getattr(obj, "model_copy", None)
+    if model_copy is not None:
+        return cast(T, model_copy(update=update))
+    return cast(T, obj.copy(update=update))  # type: ignore[attr-defined]
 
 
 def _generate_uuid(page_content: str) -> str:
-    """根据页面内容为文档生成UUID。"""
-    md5_hash = hashlib.md5(page_content.encode()).hexdigest()
-    return str(uuid.UUID(md5_hash))
+    """根据页面内容为文档生成UUID。
+
+    ID仅用于去重，按DOC_ID_SCHEME计算128位摘要并格式化为8-4-4-4-12形式，
+    md5方案的结果与 str(uuid.UUID(md5_hex)) 一致。
+    """
+    hasher = _ID_HASH_TEMPLATE.copy()
+    hasher.update(page_content.encode("utf-8"))
+    h = hasher.hexdigest()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _generate_uuids_bulk(contents: list[str]) -> list[str]:
+    """批量生成UUID，大批量的长文本按CPU核数分片并行计算。
+
+    Args:
+        contents (list[str]): 文档内容。
+
+    Returns:
+        list[str]: 与输入顺序一致的UUID字符串。
+    """
+    global _hash_pool
+    n = len(contents)
+    if (
+        n < _HASH_POOL_MIN_BATCH
+        or _HASH_POOL_WORKERS == 1
+        or sum(map(len, contents)) < n * _HASH_POOL_MIN_AVG_LEN
+    ):
+        return list(map(_generate_uuid, contents))
+
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(
+            max_workers=_HASH_POOL_WORKERS, thread_name_prefix="uuid-hash"
+        )
+    size = -(-n // _HASH_POOL_WORKERS)
+    chunks = [contents[i : i + size] for i in range(0, n, size)]
+    results = _hash_pool.map(lambda chunk: list(map(_generate_uuid, chunk)), chunks)
+    return list(chain.from_iterable(results))
+
+
+def _handle_str(item: str, existing_ids: set) -> Optional[Document]:
+    """将字符串转换为文档，ID已出现过时返回None。"""
+    item_id = _generate_uuid(item)
+    n = len(existing_ids)
+    existing_ids.add(item_id)
+    if len(existing_ids) == n:
+        return None
+    return Document(page_content=item, metadata={"uuid": item_id})
+
+
+# 由_handle_dict显式传入、不从字典中透传的字段
+_DOC_FIELDS = frozenset({"page_content", "metadata"})
+
+
+def _handle_dict(item: dict[str, Any], existing_ids: set) -> Optional[Document]:
+    """将字典转换为文档，ID已出现过时返回None。"""
+    metadata = item.get("metadata", {})
+    item_id = metadata.get("uuid") or _generate_uuid(item.get("page_content", ""))
+
+    n = len(existing_ids)
+    existing_ids.add(item_id)
+    if len(existing_ids) == n:
+        return None
+    return Document(
+        page_content=item.get("page_content", ""),
+        metadata={**metadata, "uuid": item_id},
+        **{k: v for k, v in item.items() if k not in _DOC_FIELDS},
+    )
+
+
+def _handle_doc(item: Document, existing_ids: set) -> Optional[Document]:
+    """为缺少ID的文档补充ID，ID已出现过时返回None。"""
+    item_id = item.metadata.get("uuid", "")
+    has_id = bool(item_id)
+    if not has_id:
+        item_id = _generate_uuid(item.page_content)
+
+    n = len(existing_ids)
+    existing_ids.add(item_id)
+    if len(existing_ids) == n:
+        return None
+    if has_id:
+        return item
+    # 只替换元数据字典，page_content等字段与原文档共享
+    return copy_with_update(item, {"metadata": {**item.metadata, "uuid": item_id}})
+
+
+# 按元素的具体类型分派，一次字典查找代替逐个isinstance判断。
+# 各处理函数先add再比较集合大小，一次哈希查找同时完成去重和登记
+_DISPATCH: dict[type, Callable[[Any, set], Optional[Document]]] = {
+    str: _handle_str,
+    dict: _handle_dict,
+    Document: _handle_doc,
+}
 
 
 def reduce_docs(
@@ -103,43 +367,52 @@ def reduce_docs(
         return []
 
     existing_list = list(existing) if existing else []
+    if isinstance(new, list) and not new:
+        return existing_list
     if isinstance(new, str):
         return existing_list + [
             Document(page_content=new, metadata={"uuid": _generate_uuid(new)})
         ]
 
-    new_list = []
-    if isinstance(new, list):
-        existing_ids = set(doc.metadata.get("uuid") for doc in existing_list)
-        for item in new:
-            if isinstance(item, str):
-                item_id = _generate_uuid(item)
-                new_list.append(Document(page_content=item, metadata={"uuid": item_id}))
-                existing_ids.add(item_id)
-
-            elif isinstance(item, dict):
-                metadata = item.get("metadata", {})
-                item_id = metadata.get("uuid") or _generate_uuid(
-                    item.get("page_content", "")
-                )
-
-                if item_id not in existing_ids:
-                    new_list.append(
-                        Document(**{**item, "metadata": {**metadata, "uuid": item_id}})
-                    )
-                    existing_ids.add(item_id)
-
-            elif isinstance(item, Document):
-                item_id = item.metadata.get("uuid", "")
-                if not item_id:
-                    item_id = _generate_uuid(item.page_content)
-                    new_item = item.copy(deep=True)
-                    new_item.metadata["uuid"] = item_id
-                else:
-                    new_item = item
-
-                if item_id not in existing_ids:
-                    new_list.append(new_item)
-                    existing_ids.add(item_id)
-
-    return existing_list + new_list
+    if not isinstance(new, list):
+        return existing_list
+
+    # 局部变量避免循环内的全局查找
+    _Document = Document
+    existing_ids = {doc.metadata.get("uuid") for doc in existing_list}
+
+    # 重放时常见的无变化更新：新文档均已存在则直接返回
+    if all(
+        isinstance(item, Document)
+        and (item_id := item.metadata.get("uuid"))
+        and item_id in existing_ids
+        for item in new
+    ):
+        return existing_list
+
+    if all(isinstance(item, str) for item in new):
+        # set.add返回None，条件同时完成去重和登记
+        return existing_list + [
+            _Document(page_content=text, metadata={"uuid": item_id})
+            for text, item_id in zip(new, _generate_uuids_bulk(new))
+            if item_id not in existing_ids and not existing_ids.add(item_id)
+        ]
+
+    # 按输入长度预分配，结束时截掉未使用的部分
+    new_list: list[Optional[Document]] = [None] * len(new)
+    size = 0
+    for item in new:
+        handler = _DISPATCH.get(type(item))
+        if handler is None:
+            # 子类实例按isinstance匹配
+            handler = next(
+                (h for t, h in _DISPATCH.items() if isinstance(item, t)), None
+            )
+        if handler is not None:
+            doc = handler(item, existing_ids)
+            if doc is not None:
+                new_list[size] = doc
+                size += 1
+    del new_list[size:]
+
+    return existing_list + cast(list[Document], new_list)
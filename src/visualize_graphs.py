@@ -11,18 +11,27 @@ between the different graphs in the system.
 -----------------------------------------------------------
 """
 
-try:
-    from IPython.display import Image, display
+from functools import lru_cache
 
-    IPYTHON_AVAILABLE = True
-except ImportError:
-    IPYTHON_AVAILABLE = False
-    print("IPython not available - visualization will not work in notebook environment")
+from langchain_core.runnables.graph_mermaid import draw_mermaid_png
 
 from src.graphs import index_graph, main_graph, researcher_graph
 from src.log_util import logger
 
 
+@lru_cache(maxsize=16)
+def _render_png(mermaid_src: str) -> bytes:
+    """Render mermaid source to PNG, cached so identical graphs render once
+
+    Args:
+        mermaid_src: Mermaid source of the graph
+
+    Returns:
+        PNG image bytes
+    """
+    return draw_mermaid_png(mermaid_src)
+
+
 def draw_graph(graph, name: str = "Graph") -> None:
     """Visualize the graph in Jupyter Notebook (if available)
 
@@ -30,12 +39,16 @@ def draw_graph(graph, name: str = "Graph") -> None:
         graph: The graph to visualize
         name: Name of the graph for display purposes
     """
+    # IPython is imported on first use to keep it out of module import time
     try:
-        if not IPYTHON_AVAILABLE:
-            logger.warning("IPython is not installed. Cannot visualize graph.")
-            return
+        from IPython.display import Image, display
+    except ImportError:
+        logger.warning("IPython is not installed. Cannot visualize graph.")
+        return
 
-        display(Image(graph.get_graph(xray=True).draw_mermaid_png()))
+    try:
+        png = _render_png(graph.get_graph(xray=True).draw_mermaid())
+        display(Image(png))
         logger.info(f"Successfully displayed {name}")
     except Exception as e:
         logger.warning(f"Could not visualize {name}: {e}")
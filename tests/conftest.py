@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   conftest.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+pytest会话配置，将项目根目录加入sys.path以便导入src包。
+-----------------------------------------------------------
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
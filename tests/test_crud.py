@@ -4,32 +4,18 @@
 @Date:       2025/09/24
 @Description:
 -----------------------------------------------------------
-
+在项目根目录下运行: python -m tests.test_crud
 -----------------------------------------------------------
 """
 
-import sys
-from pathlib import Path
-
-if "__file__" in globals():
-    base_path = Path(__file__).resolve().parent
-else:
-    base_path = Path.cwd()
-
-parent_dir = base_path.parent
-grandparent_dir = parent_dir.parent
-
-# 需要添加的目录列表（按优先级从高到低）
-dirs_to_add = [parent_dir, grandparent_dir]
-
-# 按优先级顺序添加到 sys.path（避免重复添加）
-for dir_path in dirs_to_add:
-    if dir_path and str(dir_path) not in sys.path:
-        sys.path.insert(1, str(dir_path))  # 插入到索引1位置
+import time
 
 from src.crud.elasticsearch_crud_manager import ElasticsearchCRUDManager
 from src.shared.configuration_manager import BaseConfiguration
 
+# Number of documents indexed by the bulk-ingest benchmark
+NUM_DOCS = 1000
+
 if __name__ == "__main__":
     print("Testing Elasticsearch CRUD operations...")
 
@@ -43,22 +29,25 @@ if __name__ == "__main__":
     count = crud_manager.count_documents()
     print(f"Number of documents: {count}")
 
-    # Add documents
+    # Bulk-add documents in a single call and time the ingest
     from langchain_core.documents import Document
 
+    topics = ["artificial intelligence", "machine learning"]
     documents = [
         Document(
-            page_content="This is a test document about artificial intelligence",
-            metadata={"source": "test"},
-        ),
-        Document(
-            page_content="This is another test document about machine learning",
+            page_content=f"Test document {i} about {topics[i % len(topics)]}",
             metadata={"source": "test"},
-        ),
+        )
+        for i in range(NUM_DOCS)
     ]
 
+    start = time.perf_counter()
     ids = crud_manager.add_documents(documents)
-    print(f"Added documents with IDs: {ids}")
+    elapsed = time.perf_counter() - start
+    print(
+        f"Added {len(ids)} documents in {elapsed:.2f}s "
+        f"({len(ids) / elapsed:.0f} docs/s)"
+    )
 
     # Search documents
     results = crud_manager.search_documents("artificial intelligence")
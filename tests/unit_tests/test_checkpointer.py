@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_checkpointer.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+延迟创建的检查点存储测试。
+-----------------------------------------------------------
+"""
+
+import asyncio
+from typing import TypedDict
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.shared.checkpointer import LazyCheckpointSaver
+
+
+class CounterState(TypedDict):
+    count: int
+
+
+def test_lazy_saver_creates_store_on_first_use():
+    created = []
+
+    def factory() -> MemorySaver:
+        created.append(MemorySaver())
+        return created[-1]
+
+    builder = StateGraph(CounterState)
+    builder.add_node("step", lambda state: {"count": state["count"] + 1})
+    builder.add_edge(START, "step")
+    builder.add_edge("step", END)
+    graph = builder.compile(checkpointer=LazyCheckpointSaver(factory))
+    assert created == []
+
+    config = {"configurable": {"thread_id": "t"}}
+    result = asyncio.run(graph.ainvoke({"count": 1}, config))
+    result = asyncio.run(graph.ainvoke({"count": result["count"]}, config))
+
+    assert result == {"count": 3}
+    assert len(created) == 1
+    assert graph.get_state(config).values == {"count": 3}
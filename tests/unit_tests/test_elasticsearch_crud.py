@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_elasticsearch_crud.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+Elasticsearch CRUD管理器的单元测试，集群以记录调用的替身代替。
+-----------------------------------------------------------
+"""
+
+import pytest
+from langchain_core.documents import Document
+
+from src.crud import elasticsearch_crud_manager
+from src.crud.elasticsearch_crud_manager import ElasticsearchCRUDManager
+from src.shared import index_cache
+from src.shared.configuration_manager import BaseConfiguration
+
+
+@pytest.fixture(autouse=True)
+def isolated_index_cache(monkeypatch, tmp_path):
+    """清空操作会删除索引缓存目录，测试中改用临时目录。"""
+    monkeypatch.setattr(index_cache, "INDEX_CACHE_DIR", str(tmp_path / "cache"))
+
+
+class FakeIndices:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+
+    def refresh(self, index: str) -> None:
+        self.calls.append("refresh")
+
+
+class FakeTasks:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+
+    def get(self, task_id: str, wait_for_completion: bool) -> None:
+        self.calls.append(("wait", task_id, wait_for_completion))
+
+
+class FakeElasticsearch:
+    def __init__(self, manager: ElasticsearchCRUDManager) -> None:
+        self.calls: list = []
+        self.manager = manager
+        self.indices = FakeIndices(self.calls)
+        self.tasks = FakeTasks(self.calls)
+
+    def delete_by_query(self, **kwargs) -> dict:
+        # 删除进行中缓存仍可能被读取，此时不应已被清空
+        self.calls.append(("delete", kwargs, self.manager._search_cache._size))
+        return {"task": "node:1"}
+
+
+def _manager() -> tuple[ElasticsearchCRUDManager, FakeElasticsearch]:
+    manager = ElasticsearchCRUDManager(
+        BaseConfiguration(retriever_provider="elastic-local")
+    )
+    es_client = FakeElasticsearch(manager)
+    manager._es_client = es_client
+    manager._search_cache.insert([1.0, 0.0], 1, [Document(page_content="a")])
+    return manager, es_client
+
+
+def test_clear_documents_waits_and_then_clears_cache():
+    manager, es_client = _manager()
+
+    assert manager.clear_documents() is None
+
+    (name, kwargs, cached), *rest = es_client.calls
+    assert name == "delete"
+    assert kwargs["refresh"] is True
+    assert kwargs.get("wait_for_completion", True) is True
+    assert cached == 1
+    assert rest == []
+    assert manager._search_cache.lookup([1.0, 0.0], 1) is None
+
+
+def test_background_clear_clears_cache_when_finished():
+    manager, es_client = _manager()
+
+    task_id = manager.start_clear_documents()
+    assert es_client.calls[0][1]["wait_for_completion"] is False
+    assert manager._search_cache.lookup([1.0, 0.0], 1) is not None
+
+    manager.finish_clear_documents(task_id)
+    assert es_client.calls[1:] == [("wait", "node:1", True), "refresh"]
+    assert manager._search_cache.lookup([1.0, 0.0], 1) is None
+
+
+class FakeSettingsIndices:
+    """记录设置调用的索引API，刷新间隔为None表示使用索引默认值。"""
+
+    def __init__(self, refresh_interval=None) -> None:
+        self.refresh_interval = refresh_interval
+        self.calls: list = []
+
+    def exists(self, index: str) -> bool:
+        return True
+
+    def get_settings(self, index: str, name: str, flat_settings: bool) -> dict:
+        settings = {}
+        if self.refresh_interval is not None:
+            settings[name] = self.refresh_interval
+        return {f"{index}-000001": {"settings": settings}}
+
+    def put_settings(self, index: str, settings: dict) -> None:
+        # 网络调用期间不应持有模块级锁
+        assert not elasticsearch_crud_manager._bulk_loads_lock.locked()
+        self.refresh_interval = settings["index"]["refresh_interval"]
+        self.calls.append(("put", self.refresh_interval))
+
+    def refresh(self, index: str) -> None:
+        self.calls.append(("refresh",))
+
+
+class FakeSettingsClient:
+    def __init__(self, refresh_interval=None) -> None:
+        self.indices = FakeSettingsIndices(refresh_interval)
+
+
+@pytest.mark.parametrize("original", ["30s", None])
+def test_refresh_disabled_restores_original_interval(original):
+    es_client = FakeSettingsClient(original)
+
+    with elasticsearch_crud_manager._refresh_disabled(es_client, "restore-test"):
+        assert es_client.indices.refresh_interval == "-1"
+
+    assert es_client.indices.refresh_interval == original
+    assert es_client.indices.calls == [("put", "-1"), ("put", original), ("refresh",)]
+
+
+def test_refresh_disabled_toggles_once_for_overlapping_loads():
+    es_client = FakeSettingsClient("5s")
+    refresh_disabled = elasticsearch_crud_manager._refresh_disabled
+
+    with refresh_disabled(es_client, "overlap-test"):
+        with refresh_disabled(es_client, "overlap-test"):
+            pass
+        # 内层加载结束时其他加载仍在进行，刷新保持关闭
+        assert es_client.indices.refresh_interval == "-1"
+
+    assert es_client.indices.calls == [("put", "-1"), ("put", "5s"), ("refresh",)]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_http_pool.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+共享HTTP连接池在多个事件循环间的行为测试。
+-----------------------------------------------------------
+"""
+
+import asyncio
+
+import httpx
+
+from src.shared import http_pool
+from src.shared.utils import LoopLocal
+
+
+def test_async_client_works_across_event_loops(monkeypatch):
+    created = []
+
+    def new_client() -> httpx.AsyncClient:
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200))
+        )
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(http_pool, "_async_clients", LoopLocal(new_client))
+    client = http_pool.get_shared_async_client()
+
+    async def request_and_close() -> int:
+        response = await client.get("http://test/")
+        await http_pool.aclose_shared_clients()
+        return response.status_code
+
+    assert asyncio.run(request_and_close()) == 200
+    assert asyncio.run(request_and_close()) == 200
+    assert len(created) == 2
+    assert all(pooled.is_closed for pooled in created)
+    assert not client.is_closed
+
+
+def test_loop_local_values_are_per_loop():
+    locks = LoopLocal(asyncio.Lock)
+
+    async def get_twice() -> asyncio.Lock:
+        first = locks.get()
+        assert locks.get() is first
+        async with first:
+            pass
+        return first
+
+    assert asyncio.run(get_twice()) is not asyncio.run(get_twice())
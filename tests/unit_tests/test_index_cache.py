@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_index_cache.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+文档索引缓存的单元测试。
+-----------------------------------------------------------
+"""
+
+import os
+
+from src.shared import index_cache
+from src.shared.configuration_manager import IndexConfiguration
+
+
+def test_cache_path_depends_on_store_target(monkeypatch):
+    configuration = IndexConfiguration(retriever_provider="elastic-local")
+
+    monkeypatch.setenv("ELASTICSEARCH_INDEX", "first")
+    first = index_cache.index_cache_path("docs.json", configuration)
+    monkeypatch.setenv("ELASTICSEARCH_INDEX", "second")
+    second = index_cache.index_cache_path("docs.json", configuration)
+    monkeypatch.setenv("ELASTICSEARCH_URL", "http://elsewhere:9200")
+    third = index_cache.index_cache_path("docs.json", configuration)
+
+    assert len({first, second, third}) == 3
+
+
+def test_clear_index_cache_drops_saved_entries(monkeypatch, tmp_path):
+    monkeypatch.setattr(index_cache, "INDEX_CACHE_DIR", str(tmp_path / "cache"))
+    configuration = IndexConfiguration(retriever_provider="elastic-local")
+    cache_path = index_cache.index_cache_path("docs.json", configuration)
+    index_cache.save_index_cache(cache_path, {"signature": [1, 2], "documents": {}})
+    assert index_cache.load_index_cache(cache_path)["signature"] == [1, 2]
+
+    index_cache.clear_index_cache()
+
+    assert not os.path.exists(cache_path)
+    assert index_cache.load_index_cache(cache_path) == {}
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_index_graph.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+索引图文档读取测试。
+-----------------------------------------------------------
+"""
+
+import asyncio
+import json
+
+from langchain_core.documents import Document
+
+from src.graphs.index_graph import _add_documents_in_shards, _stream_docs
+
+
+def _collect(path: str) -> list:
+    """读取文件中的全部文档。"""
+
+    async def _run() -> list:
+        return [doc async for batch in _stream_docs(path) for doc in batch]
+
+    return asyncio.run(_run())
+
+
+def test_stream_docs_parses_floats_as_float(tmp_path):
+    path = tmp_path / "docs.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"page_content": "a", "metadata": {"score": 0.5, "page": 3}},
+                {"page_content": "b", "metadata": {"score": 1.25}},
+            ]
+        )
+    )
+
+    docs = _collect(str(path))
+
+    assert [doc.page_content for doc in docs] == ["a", "b"]
+    assert type(docs[0].metadata["score"]) is float
+    assert type(docs[0].metadata["page"]) is int
+    assert docs[1].metadata["score"] == 1.25
+
+
+class RecordingRetriever:
+    """记录写入顺序的检索器，首次写入前其他写入不能开始。"""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.active = 0
+        self.created = False
+
+    async def aadd_documents(self, docs: list) -> None:
+        assert self.created or self.active == 0, "并发写入时索引尚未创建"
+        self.active += 1
+        await asyncio.sleep(0.01)
+        self.created = True
+        self.active -= 1
+        self.batches.append([doc.page_content for doc in docs])
+
+
+def test_add_documents_in_shards_creates_store_before_fan_out():
+    retriever = RecordingRetriever()
+    docs = [Document(page_content="x" * n) for n in range(1, 9)]
+
+    asyncio.run(_add_documents_in_shards(retriever, docs, 4, create_store=True))
+
+    assert retriever.batches[0] == ["x"]
+    assert sorted(c for batch in retriever.batches for c in batch) == sorted(
+        doc.page_content for doc in docs
+    )
+    assert len(retriever.batches) == 5
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_llm_cache.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+LLM响应缓存的单元测试，Redis以内存替身代替。
+-----------------------------------------------------------
+"""
+
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from src.shared import llm_cache as llm_cache_module
+from src.shared.llm_cache import LLMCache, cache_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict = {}
+        self.expiry: dict = {}
+
+    async def get(self, key: str):
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, ex: int) -> None:
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    async def scan_iter(self, pattern: str):
+        for key in list(self.data):
+            yield key
+
+    async def delete(self, key: str) -> None:
+        del self.data[key]
+
+
+def test_cache_key_depends_on_model_messages_and_schema():
+    messages = [{"role": "user", "content": "hi"}]
+
+    key = cache_key("openai/gpt-4o", messages)
+
+    assert key == cache_key("openai/gpt-4o", [{"role": "user", "content": "hi"}])
+    assert key != cache_key("openai/gpt-4o-mini", messages)
+    assert key != cache_key("openai/gpt-4o", [{"role": "user", "content": "hello"}])
+    assert cache_key("openai/gpt-4o", messages, deterministic=False) is None
+
+
+def test_miss_then_hit_returns_a_copy():
+    cache = LLMCache(max_size=4, ttl=60)
+
+    async def run():
+        assert await cache.get("k") is None
+        await cache.set("k", AIMessage(content="answer"))
+        first = await cache.get("k")
+        first.content = "changed"
+        return await cache.get("k")
+
+    assert asyncio.run(run()).content == "answer"
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_cache_module.time, "monotonic", clock)
+    cache = LLMCache(max_size=4, ttl=60)
+
+    async def run():
+        await cache.set("k", AIMessage(content="answer"))
+        clock.now += 59
+        hit = await cache.get("k")
+        clock.now += 2
+        return hit, await cache.get("k")
+
+    hit, expired = asyncio.run(run())
+
+    assert hit.content == "answer"
+    assert expired is None
+    assert "k" not in cache._entries
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(max_size=2, ttl=60)
+
+    async def run():
+        await cache.set("a", AIMessage(content="a"))
+        await cache.set("b", AIMessage(content="b"))
+        await cache.get("a")
+        await cache.set("c", AIMessage(content="c"))
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    a, b, c = asyncio.run(run())
+
+    assert (a.content, b, c.content) == ("a", None, "c")
+
+
+def test_redis_backend_sets_ttl_and_clears():
+    cache = LLMCache(ttl=90)
+    redis = FakeRedis()
+    cache._redis = redis
+
+    async def run():
+        await cache.set("k", AIMessage(content="answer"))
+        hit = await cache.get("k")
+        await cache.clear()
+        return hit, await cache.get("k")
+
+    hit, cleared = asyncio.run(run())
+
+    assert hit.content == "answer"
+    assert redis.expiry == {"llm_cache:k": 90}
+    assert cleared is None
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_main_graph.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+主图路由的单元测试，模型调用以固定回复代替。
+-----------------------------------------------------------
+"""
+
+import asyncio
+import importlib
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.vectorstores import InMemoryVectorStore
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END
+
+from src.shared.model_manager import model_manager
+from src.shared.state import AgentState, Router
+
+mg = importlib.import_module("src.graphs.main_graph")
+rg = importlib.import_module("src.graphs.researcher_graph")
+
+CONFIG = {"configurable": {"tagged_routing": True}}
+
+
+@pytest.fixture
+def replies(monkeypatch):
+    """以固定回复代替模型调用，结构化调用返回预设的路由结果。"""
+    calls = {"text": [], "structured": None}
+
+    async def fake_ainvoke(name, messages, schema=None, **kwargs):
+        if schema is not None:
+            return calls["structured"]
+        return AIMessage(content=calls["text"].pop(0))
+
+    monkeypatch.setattr(model_manager, "ainvoke", fake_ainvoke)
+    return calls
+
+
+def _plan(state: AgentState) -> dict:
+    return asyncio.run(mg.analyze_and_plan(state, config=CONFIG))
+
+
+def _state() -> AgentState:
+    return AgentState(messages=[HumanMessage(content="hi")])
+
+
+def test_general_tag_returns_reply(replies):
+    replies["text"].append("<GEN> Hello there")
+
+    update = _plan(_state())
+
+    assert update["router"]["type"] == "general"
+    assert update["steps"] == []
+    assert isinstance(update["messages"][0], AIMessage)
+    assert update["messages"][0].content == "Hello there"
+
+
+def test_think_block_is_stripped(replies):
+    replies["text"].append("<think>\n<RAG> not this\n</think>\n<MORE> Which one?")
+
+    update = _plan(_state())
+
+    assert update["router"]["type"] == "more-info"
+    assert update["messages"][0].content == "Which one?"
+
+
+def test_rag_tag_parses_numbered_steps(replies):
+    replies["text"].append("<RAG>\n1. first step\n2) second step\n- third step\n\n")
+
+    update = _plan(_state())
+
+    assert update["router"]["type"] == "rag-research"
+    assert update["steps"] == ["first step", "second step", "third step"]
+    assert "messages" not in update
+
+
+def test_untagged_reply_falls_back_to_structured(replies):
+    replies["text"].append("I am not sure")
+    replies["structured"] = {
+        "router": Router(type="rag-research", logic="needs docs"),
+        "steps": ["look it up"],
+    }
+
+    update = _plan(_state())
+
+    assert update == {
+        "router": replies["structured"]["router"],
+        "steps": ["look it up"],
+    }
+
+
+def test_route_query_ends_after_tagged_reply():
+    state = _state()
+    state.messages.append(AIMessage(content="Hello there"))
+    state.router = Router(type="general", logic="")
+
+    assert mg.route_query(state) == END
+
+
+def test_route_query_dispatches_without_reply():
+    state = _state()
+    state.router = Router(type="rag-research", logic="")
+    assert mg.route_query(state) == "conduct_research"
+
+    state.router = Router(type="more-info", logic="")
+    assert mg.route_query(state) == "ask_for_more_info"
+
+
+class FailingResearcher:
+    """每个研究步骤都失败的研究子图。"""
+
+    async def ainvoke(self, state, config):
+        raise ConnectionError("vector store unavailable")
+
+
+def test_conduct_research_raises_when_every_step_fails(monkeypatch):
+    monkeypatch.setattr(mg, "researcher_graph", FailingResearcher())
+    state = _state()
+    state.steps = ["first", "second"]
+
+    with pytest.raises(RuntimeError, match="All 2 research steps failed"):
+        asyncio.run(mg.conduct_research(state, config=CONFIG))
+
+
+class CountingSaver(MemorySaver):
+    """按检查点命名空间记录写入次数的检查点存储。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.namespaces: list[str] = []
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        self.namespaces.append(config["configurable"].get("checkpoint_ns", ""))
+        return await super().aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, *args):
+        self.namespaces.append(config["configurable"].get("checkpoint_ns", ""))
+        return await super().aput_writes(config, writes, task_id, *args)
+
+
+def test_research_subgraph_does_not_write_checkpoints(monkeypatch):
+    async def fake_ainvoke(name, messages, schema=None, **kwargs):
+        if schema is mg.RouteAndPlan:
+            return {"router": Router(type="rag-research", logic=""), "steps": ["a"]}
+        if schema is not None:
+            return {"queries": ["first", "second"]}
+        return AIMessage(content="answer")
+
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    store.add_documents([Document(page_content="doc")])
+
+    async def fake_make_retriever(config):
+        return store.as_retriever()
+
+    monkeypatch.setattr(model_manager, "ainvoke", fake_ainvoke)
+    monkeypatch.setattr(rg, "make_retriever", fake_make_retriever)
+    rg._retrieval_cache.clear()
+    saver = CountingSaver()
+    graph = mg.builder.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "t", "tagged_routing": False}}
+
+    result = asyncio.run(
+        graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+    )
+
+    assert result["messages"][-1].content == "answer"
+    assert [doc.page_content for doc in result["documents"]] == ["doc"]
+    # 只有主图写入检查点，研究子图的命名空间不出现
+    assert saver.namespaces
+    assert all(namespace == "" for namespace in saver.namespaces)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_model_manager.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+模型管理器调用逻辑的单元测试。
+-----------------------------------------------------------
+"""
+
+import asyncio
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.shared.model_manager import model_manager
+
+
+class EmptyStreamChatModel(GenericFakeChatModel):
+    """流式调用不产出任何片段的模型。"""
+
+    async def astream(self, *args, **kwargs):
+        return
+        yield
+
+
+def test_stream_falls_back_to_invoke_on_empty_stream(monkeypatch):
+    model = EmptyStreamChatModel(messages=iter([AIMessage(content="answer")]))
+
+    async def fake_aget_model(name):
+        return model
+
+    monkeypatch.setattr(model_manager, "aget_model", fake_aget_model)
+
+    response = asyncio.run(model_manager.ainvoke("fake/model", ["hi"], stream=True))
+
+    assert response.content == "answer"
+
+
+def test_stream_joins_chunks(monkeypatch):
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="hello world")]))
+
+    async def fake_aget_model(name):
+        return model
+
+    monkeypatch.setattr(model_manager, "aget_model", fake_aget_model)
+
+    response = asyncio.run(model_manager.ainvoke("fake/model", ["hi"], stream=True))
+
+    assert isinstance(response, AIMessage)
+    assert response.content == "hello world"
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_mongodb_crud.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+MongoDB CRUD管理器清空逻辑的单元测试，数据库以记录调用的替身代替。
+-----------------------------------------------------------
+"""
+
+import pytest
+from langchain_core.documents import Document
+
+from src.crud.mongodb_crud_manager import MongoDBCRUDManager
+from src.shared import index_cache
+from src.shared.configuration_manager import BaseConfiguration
+
+
+@pytest.fixture(autouse=True)
+def isolated_index_cache(monkeypatch, tmp_path):
+    """清空操作会删除索引缓存目录，测试中改用临时目录。"""
+    monkeypatch.setattr(index_cache, "INDEX_CACHE_DIR", str(tmp_path / "cache"))
+
+
+class FakeCollection:
+    def __init__(self, calls: list, search_indexes: list) -> None:
+        self.calls = calls
+        self.search_indexes = search_indexes
+
+    def list_search_indexes(self) -> list:
+        return self.search_indexes
+
+    def index_information(self) -> dict:
+        return {"_id_": {"key": [("_id", 1)]}, "source_1": {"key": [("source", 1)]}}
+
+    def delete_many(self, query: dict) -> None:
+        self.calls.append("delete_many")
+
+    def create_index(self, keys, name: str, **kwargs) -> None:
+        self.calls.append(("create_index", name))
+
+
+class FakeDatabase:
+    def __init__(self, collection: FakeCollection) -> None:
+        self.collection = collection
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.collection
+
+    def drop_collection(self, name: str) -> None:
+        self.collection.calls.append("drop")
+
+
+class FakeClient:
+    def __init__(self, search_indexes: list) -> None:
+        self.calls: list = []
+        self.database = FakeDatabase(FakeCollection(self.calls, search_indexes))
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        return self.database
+
+
+def _manager(search_indexes: list) -> tuple[MongoDBCRUDManager, FakeClient]:
+    manager = MongoDBCRUDManager(BaseConfiguration(retriever_provider="mongodb"))
+    client = FakeClient(search_indexes)
+    manager._client = client
+    manager._search_cache.insert([1.0, 0.0], 1, [Document(page_content="a")])
+    return manager, client
+
+
+def test_clear_keeps_collection_with_search_indexes():
+    manager, client = _manager([{"name": "vector_index", "queryable": True}])
+
+    manager.clear_documents()
+
+    assert client.calls == ["delete_many"]
+    assert manager._search_cache.lookup([1.0, 0.0], 1) is None
+
+
+def test_clear_drops_collection_without_search_indexes():
+    manager, client = _manager([])
+
+    manager.clear_documents()
+
+    assert client.calls == ["drop", ("create_index", "source_1")]
+    assert manager._search_cache.lookup([1.0, 0.0], 1) is None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_researcher_graph.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+研究者图批量检索测试。
+-----------------------------------------------------------
+"""
+
+import asyncio
+import importlib
+
+from elasticsearch import Elasticsearch
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_elasticsearch import ElasticsearchStore
+
+from src.shared.state import ResearcherState
+
+rg = importlib.import_module("src.graphs.researcher_graph")
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """记录嵌入调用次数的测试编码器。"""
+
+    query_calls: int = 0
+    document_calls: int = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        self.query_calls += 1
+        return super().embed_query(text)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.document_calls += 1
+        return super().embed_documents(texts)
+
+
+def test_supports_batch_for_elasticsearch():
+    store = ElasticsearchStore(
+        index_name="index",
+        embedding=DeterministicFakeEmbedding(size=8),
+        es_connection=Elasticsearch("http://localhost:9200"),
+    )
+
+    assert rg._supports_batch(store.as_retriever())
+    assert not rg._supports_batch(store.as_retriever(search_type="mmr"))
+
+
+def test_batch_path_embeds_queries_once(monkeypatch):
+    embeddings = CountingEmbeddings(size=8)
+    store = InMemoryVectorStore(embedding=embeddings)
+    store.add_documents(
+        [Document(page_content=text) for text in ("alpha", "beta", "gamma")]
+    )
+    embeddings.document_calls = 0
+    retriever = store.as_retriever(search_kwargs={"k": 2})
+
+    async def fake_make_retriever(config):
+        return retriever
+
+    monkeypatch.setattr(rg, "make_retriever", fake_make_retriever)
+    rg._retrieval_cache.clear()
+    state = ResearcherState(question="q", queries=["alpha", "beta", "gamma"])
+    config = {"configurable": {"thread_id": "test"}}
+
+    route = asyncio.run(rg.retrieve_in_parallel(state, config=config))
+    result = asyncio.run(rg.retrieve_batch(state, config=config))
+
+    assert route == "retrieve_batch"
+    assert embeddings.document_calls == 1
+    assert embeddings.query_calls == 0
+    assert {doc.page_content for doc in result["documents"]} <= {
+        "alpha",
+        "beta",
+        "gamma",
+    }
+    assert result["documents"]
+
+
+class SlowVectorStore(InMemoryVectorStore):
+    """记录同时进行的按向量检索数量的向量存储。"""
+
+    active: int = 0
+    peak: int = 0
+
+    async def asimilarity_search_by_vector(self, embedding, k=4, **kwargs):
+        type(self).active += 1
+        type(self).peak = max(type(self).peak, type(self).active)
+        await asyncio.sleep(0.01)
+        type(self).active -= 1
+        return self.similarity_search_by_vector(embedding, k=k, **kwargs)
+
+
+def test_batch_searches_respect_research_concurrency(monkeypatch):
+    store = SlowVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    store.add_documents([Document(page_content="alpha")])
+    retriever = store.as_retriever()
+
+    async def fake_make_retriever(config):
+        return retriever
+
+    monkeypatch.setattr(rg, "make_retriever", fake_make_retriever)
+    rg._retrieval_cache.clear()
+    queries = [f"query {i}" for i in range(6)]
+    state = ResearcherState(question="q", queries=queries)
+    config = {"configurable": {"research_concurrency": 2}}
+
+    result = asyncio.run(rg.retrieve_batch(state, config=config))
+
+    assert result["documents"]
+    assert SlowVectorStore.peak == 2
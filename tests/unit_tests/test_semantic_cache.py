@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_semantic_cache.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+检索结果语义缓存及批量检索的单元测试，向量存储以替身代替。
+-----------------------------------------------------------
+"""
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.crud import semantic_cache as semantic_cache_module
+from src.crud.elasticsearch_crud_manager import ElasticsearchCRUDManager
+from src.crud.milvus_crud_manager import MilvusCRUDManager
+from src.crud.mongodb_crud_manager import MongoDBCRUDManager
+from src.crud.semantic_cache import SemanticCache
+from src.shared.configuration_manager import BaseConfiguration
+
+DOCS = [Document(page_content="a"), Document(page_content="b")]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class OneHotEmbeddings(Embeddings):
+    """每个查询映射到独立坐标轴上的单位向量，不同查询互不相似。"""
+
+    def __init__(self, queries: list) -> None:
+        self.queries = queries
+
+    def embed_documents(self, texts: list) -> list:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list:
+        vector = [0.0] * len(self.queries)
+        vector[self.queries.index(text)] = 1.0
+        return vector
+
+
+def test_lookup_hits_similar_embedding_and_misses_dissimilar():
+    cache = SemanticCache(max_size=4, ttl=60, threshold=0.95)
+    cache.insert([1.0, 0.0], 2, DOCS)
+
+    assert cache.lookup([2.0, 0.01], 2) == DOCS
+    assert cache.lookup([0.0, 1.0], 2) is None
+
+
+def test_lookup_truncates_to_k_and_misses_larger_k():
+    cache = SemanticCache(max_size=4, ttl=60)
+    cache.insert([1.0, 0.0], 2, DOCS)
+
+    assert cache.lookup([1.0, 0.0], 1) == DOCS[:1]
+    assert cache.lookup([1.0, 0.0], 3) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(semantic_cache_module.time, "monotonic", clock)
+    cache = SemanticCache(max_size=4, ttl=60)
+    cache.insert([1.0, 0.0], 2, DOCS)
+
+    clock.now += 59
+    assert cache.lookup([1.0, 0.0], 2) == DOCS
+    clock.now += 2
+    assert cache.lookup([1.0, 0.0], 2) is None
+
+
+def test_oldest_entry_is_overwritten_when_full():
+    cache = SemanticCache(max_size=2, ttl=60)
+    for axis in range(3):
+        vector = [0.0, 0.0, 0.0]
+        vector[axis] = 1.0
+        cache.insert(vector, 1, [Document(page_content=str(axis))])
+
+    assert cache.lookup([1.0, 0.0, 0.0], 1) is None
+    assert cache.lookup([0.0, 1.0, 0.0], 1)[0].page_content == "1"
+    assert cache.lookup([0.0, 0.0, 1.0], 1)[0].page_content == "2"
+
+
+@pytest.mark.parametrize(
+    "manager_cls",
+    [ElasticsearchCRUDManager, MilvusCRUDManager, MongoDBCRUDManager],
+)
+def test_search_documents_batch_keeps_query_order_with_mixed_hits(manager_cls):
+    queries = ["q0", "q1", "q2", "q3"]
+    embeddings = OneHotEmbeddings(queries)
+    manager = manager_cls(BaseConfiguration())
+    manager.embedding_model = embeddings
+    for query in ("q1", "q3"):
+        manager._search_cache.insert(
+            embeddings.embed_query(query), 2, [Document(page_content=f"{query}:cached")]
+        )
+    searched: list = []
+
+    def fake_search_by_vectors(vectors, k):
+        searched.extend(queries[vector.index(1.0)] for vector in vectors)
+        return [
+            [Document(page_content=f"{queries[vector.index(1.0)]}:searched")]
+            for vector in vectors
+        ]
+
+    manager._search_by_vectors = fake_search_by_vectors
+
+    results = manager.search_documents_batch(queries, k=2)
+
+    assert searched == ["q0", "q2"]
+    assert [docs[0].page_content for docs in results] == [
+        "q0:searched",
+        "q1:cached",
+        "q2:searched",
+        "q3:cached",
+    ]
+    # 未命中的结果写入缓存，再次查询不再访问向量存储
+    assert manager.search_documents_batch(["q2", "q0"], k=2)[0][0].page_content == (
+        "q2:searched"
+    )
+    assert searched == ["q0", "q2"]
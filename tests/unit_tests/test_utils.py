@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""@Author:     sai.chen
+@FileName:   test_utils.py
+@Date:       2026/10/15
+@Description:
+-----------------------------------------------------------
+共享工具函数的单元测试。
+-----------------------------------------------------------
+"""
+
+import hashlib
+import uuid
+
+from langchain_core.documents import Document
+
+from src.shared.utils import _generate_uuid, reduce_docs
+
+
+def test_reduce_docs_adds_uuid_to_documents_without_one():
+    original = Document(page_content="a", metadata={"source": "x"})
+
+    result = reduce_docs(None, [original, Document(page_content="b")])
+
+    assert [doc.page_content for doc in result] == ["a", "b"]
+    assert all(doc.metadata["uuid"] for doc in result)
+    assert result[0].metadata["source"] == "x"
+    # 原文档不被修改
+    assert "uuid" not in original.metadata
+
+
+def test_reduce_docs_dedupes_documents_without_uuid():
+    existing = reduce_docs(None, [Document(page_content="a")])
+
+    result = reduce_docs(
+        existing, [Document(page_content="a"), Document(page_content="c")]
+    )
+
+    assert [doc.page_content for doc in result] == ["a", "c"]
+
+
+def test_reduce_docs_keeps_existing_uuid():
+    doc = Document(page_content="a", metadata={"uuid": "fixed"})
+
+    result = reduce_docs(None, [doc, {"page_content": "a"}, "b"])
+
+    assert result[0] is doc
+    assert [d.page_content for d in result] == ["a", "a", "b"]
+
+
+def test_generate_uuid_matches_legacy_md5_ids():
+    # 默认方案必须与历史ID一致，否则已存储的文档无法去重
+    content = "文档内容" * 1000
+
+    expected = str(uuid.UUID(hashlib.md5(content.encode()).hexdigest()))
+
+    assert _generate_uuid(content) == expected